@@ -10,23 +10,45 @@ Everything else is auto-approved without notification.
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 import re
-import shlex
-import subprocess
 import sys
-import urllib.error
-import urllib.request
-import uuid
-
-SERVER_URL = "http://127.0.0.1:19280"
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+
+# http.client (forwarding to the server) and subprocess (git / tmux lookups) are
+# imported where they are used: together they cost more start-up time than the
+# auto-allow path itself.  For the annotations, type checkers see the import
+# below; at run time it is skipped (so is typing: this flag stands in for
+# typing.TYPE_CHECKING, which type checkers recognize by name).
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import http.client
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 19280
+# The server's Unix socket, when it also listens on one (skips loopback TCP)
+SERVER_SOCK = os.environ.get("DISCLAUDE_SOCK", "")
 DEBUG_LOG = "/tmp/disclaude-hook-debug.log"
 
+# Constant hook outputs, encoded once instead of per call
+_ALLOW_JSON = json.dumps({"decision": "allow"})
+_DENY_JSON = json.dumps({"decision": "deny"})
+
 # Commands that delete or destroy data
-DESTRUCTIVE_COMMANDS = {
+DESTRUCTIVE_COMMANDS = frozenset({
     "rm", "rmdir", "shred", "unlink",
-}
+})
+
+# One command of a compound command line: everything up to ||, &&, ;, | or a
+# newline (a lone & as in 2>&1 stays part of the command)
+_SEGMENT_RE = re.compile(r"(?:[^|;&\n]|(?<!&)&(?!&))+")
+
+# Base command of a single command, skipping leading VAR=value and sudo
+_BASE_CMD_RE = re.compile(r"(?:(?:(?!-)\S*=\S*|sudo)(?:\s+|$))*(\S+)?")
 
 # Destructive git subcommands — these destroy uncommitted/untracked work
 # which is NOT recoverable from git history, so always require approval
@@ -40,22 +62,157 @@ DESTRUCTIVE_GIT_PATTERNS = [
     r"\bgit\s+restore\s+(?!--staged)", # git restore <file> (discard uncommitted)
 ]
 
+# All destructive git patterns fused into one alternation, compiled once at import
+_DESTRUCTIVE_GIT_RE = re.compile("|".join(f"(?:{p})" for p in DESTRUCTIVE_GIT_PATTERNS))
+
+# Anything that could make a command line destructive, found in one scan of the
+# whole line: a destructive command word or a destructive git invocation
+_DESTRUCTIVE_HINT_RE = re.compile(
+    r"\b(?:" + "|".join(sorted(DESTRUCTIVE_COMMANDS)) + r")\b|" + _DESTRUCTIVE_GIT_RE.pattern
+)
+
+
+# Debug lines are buffered and written out by _flush_log() once per hook run;
+# the log fd is opened on first flush and then kept open (for the daemon's lifetime)
+_log_buf: list[str] = []
+_log_fd = -1
+_log_lock = threading.Lock()
+
 
 def _log(msg: str) -> None:
-    """Append debug line to log file."""
+    """Buffer a debug line for the log file."""
+    line = f"{time.strftime('%H:%M:%S')} {msg}\n"
+    # Under the lock: in the daemon, another thread may be mid-flush
+    with _log_lock:
+        _log_buf.append(line)
+
+
+def _flush_log() -> None:
+    """Append all buffered debug lines to the log file."""
+    global _log_fd
+    with _log_lock:
+        if not _log_buf:
+            return
+        data = "".join(_log_buf).encode()
+        _log_buf.clear()
+        try:
+            if _log_fd < 0:
+                _log_fd = os.open(DEBUG_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            # A single write() to an O_APPEND fd keeps concurrent hooks' lines intact
+            os.write(_log_fd, data)
+        except Exception:
+            pass
+
+
+# Idle keep-alive connections to the server, reused across requests when the
+# hook runs inside disclaude_gate_hookd (one connection per in-flight request)
+_idle_conns: list[http.client.HTTPConnection] = []
+_idle_conns_lock = threading.Lock()
+
+
+@functools.cache
+def _unix_connection_class() -> type[http.client.HTTPConnection]:
+    """HTTPConnection over a Unix socket (built on first use, like the import)."""
+    import http.client
+    import socket
+
+    class UnixHTTPConnection(http.client.HTTPConnection):
+        def __init__(self, path: str, timeout: float) -> None:
+            super().__init__("localhost", timeout=timeout)
+            self.path = path
+
+        def connect(self) -> None:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(self.timeout)
+            self.sock.connect(self.path)
+
+    return UnixHTTPConnection
+
+
+def _new_connection() -> http.client.HTTPConnection:
+    """Connect to the server over its Unix socket if configured, else over TCP."""
+    if SERVER_SOCK:
+        return _unix_connection_class()(SERVER_SOCK, timeout=600)
+    import http.client
+
+    return http.client.HTTPConnection(SERVER_HOST, SERVER_PORT, timeout=600)
+
+
+def _post_json(path: str, payload: bytes) -> dict:
+    """POST a JSON payload to the server and return the decoded JSON response.
+
+    Raises OSError when the server is not reachable.
+    """
+    import http.client
+
+    with _idle_conns_lock:
+        conn = _idle_conns.pop() if _idle_conns else None
+    reused = conn is not None
+    if conn is None:
+        conn = _new_connection()
     try:
-        import datetime
-        with open(DEBUG_LOG, "a") as f:
-            f.write(f"{datetime.datetime.now():%H:%M:%S} {msg}\n")
-    except Exception:
-        pass
+        conn.request("POST", path, body=payload, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        body = resp.read()
+    except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+        conn.close()
+        if not reused:
+            raise
+        # The server closed an idle keep-alive connection — retry on a fresh one
+        return _post_json(path, payload)
+    except BaseException:
+        conn.close()
+        raise
+
+    if resp.will_close:
+        conn.close()
+    else:
+        with _idle_conns_lock:
+            _idle_conns.append(conn)
+    if resp.status != 200:
+        raise http.client.HTTPException(f"HTTP {resp.status}: {body[:200]!r}")
+    return json.loads(body)
+
+
+# POSIX shell words as shlex.split sees them: runs of unquoted characters,
+# backslash escapes and complete '...' / "..." strings, concatenated
+_WORD_RE = re.compile(r"""(?:[^ \t\r\n'"\\]|\\.|'[^']*'|"(?:[^"\\]|\\.)*")+""", re.S)
+_WORD_PART_RE = re.compile(r"""'([^']*)'|"((?:[^"\\]|\\.)*)"|\\(.)|([^'"\\]+)""", re.S)
+_WORD_BLANKS = " \t\r\n"  # shlex's whitespace
+# Inside double quotes shlex only treats \\ and \" as escapes
+_DQ_ESCAPE_RE = re.compile(r'\\([\\"])')
+
+
+def _unquote_part(m: re.Match[str]) -> str:
+    single, double, escaped, plain = m.groups()
+    if single is not None:
+        return single
+    if double is not None:
+        return _DQ_ESCAPE_RE.sub(r"\1", double)
+    return escaped if escaped is not None else plain
+
+
+def _split_words(part: str) -> list[str] | None:
+    """shlex.split for plain command lines; None on an unterminated quote or escape."""
+    words: list[str] = []
+    end = 0
+    for m in _WORD_RE.finditer(part):
+        if part[end:m.start()].strip(_WORD_BLANKS):
+            return None  # A quote or backslash that no word could consume
+        word = m.group()
+        if "'" in word or '"' in word or "\\" in word:
+            word = _WORD_PART_RE.sub(_unquote_part, word)
+        words.append(word)
+        end = m.end()
+    if part[end:].strip(_WORD_BLANKS):
+        return None
+    return words
 
 
 def _parse_rm_targets(part: str) -> list[str]:
     """Extract file/dir targets from an rm/rmdir/shred/unlink command string."""
-    try:
-        tokens = shlex.split(part)
-    except ValueError:
+    tokens = _split_words(part)
+    if tokens is None:
         return []  # Can't parse → empty triggers approval
 
     # Skip env vars and sudo to find the command name
@@ -90,207 +247,255 @@ def _parse_rm_targets(part: str) -> list[str]:
     return paths
 
 
-def _all_git_recoverable(paths: list[str]) -> bool:
-    """Check if ALL deletion targets are recoverable from git history.
-
-    Returns True only when every target is tracked by git and there is
-    no untracked content that would be lost.  Returns False (= needs
-    Discord approval) when in doubt.
-    """
-    # Must be inside a git repo
-    try:
-        proc = subprocess.run(
-            ["git", "rev-parse", "--is-inside-work-tree"],
-            capture_output=True, text=True, timeout=5,
-        )
-        if proc.returncode != 0:
-            return False
-    except Exception:
-        return False
+@functools.lru_cache(maxsize=8)
+def _git_repo_root(cwd: str) -> str:
+    """Return the git work tree root containing cwd, or "" when not in a repo."""
+    import subprocess
 
-    # Get repo root to detect paths outside the repo
     try:
         proc = subprocess.run(
             ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True, text=True, timeout=5,
+            capture_output=True, text=True, timeout=5, cwd=cwd,
         )
-        repo_root = proc.stdout.strip() if proc.returncode == 0 else None
     except Exception:
-        repo_root = None
+        return ""
+    return proc.stdout.strip() if proc.returncode == 0 else ""
+
+
+def _all_git_recoverable(paths: list[str], cwd: str) -> bool:
+    """Check if ALL deletion targets (relative to cwd) are recoverable from git history.
 
+    Returns True only when every target is tracked by git and there is
+    no untracked content that would be lost.  Returns False (= needs
+    Discord approval) when in doubt.
+    """
     if not paths:
         return False  # No targets found → can't verify, be safe
 
-    for path in paths:
-        # Paths with shell expansion ($, `, subshells) can't be verified
-        if any(c in path for c in ("$", "`", "(", ")")):
-            return False
+    # Cheap pure-Python rejections first, so e.g. "rm $TMP/x" never forks git.
+    # Paths with shell expansion ($, `, subshells) can't be verified
+    if any(c in path for path in paths for c in ("$", "`", "(", ")")):
+        return False
 
-        # Absolute paths outside the repo are not recoverable
-        if os.path.isabs(path) and repo_root:
-            resolved = os.path.normpath(path)
+    # Absolute paths outside the repo are not recoverable.  The repo root is
+    # only looked up when there is an absolute path to compare against;
+    # otherwise `git ls-files` below fails by itself outside a repo.
+    abs_paths = [os.path.normpath(p) for p in paths if os.path.isabs(p)]
+    if abs_paths:
+        repo_root = _git_repo_root(cwd)
+        if not repo_root:
+            return False
+        for resolved in abs_paths:
             if not resolved.startswith(repo_root + os.sep) and resolved != repo_root:
                 return False
 
-        try:
-            # Check for untracked files matching this path (includes .gitignore'd files)
-            proc = subprocess.run(
-                ["git", "ls-files", "--others", path],
-                capture_output=True, text=True, timeout=5,
-            )
-            if proc.returncode == 0 and proc.stdout.strip():
-                return False  # Would delete untracked content
+    # One batched lookup for untracked files under any target (includes .gitignore'd files).
+    # If nothing untracked → each target is either tracked (recoverable from git history)
+    # or doesn't exist (rm is a no-op) → safe
+    import subprocess
 
-            # Verify the path has some tracked content
-            proc = subprocess.run(
-                ["git", "ls-files", path],
-                capture_output=True, text=True, timeout=5,
-            )
-            # If nothing tracked and nothing untracked → path doesn't exist, rm is a no-op → safe
-            # If tracked content exists → recoverable from git history → safe
-        except Exception:
-            return False
+    try:
+        proc = subprocess.run(
+            ["git", "ls-files", "--others", "--", *paths],
+            capture_output=True, text=True, timeout=5, cwd=cwd,
+        )
+    except Exception:
+        return False
+    if proc.returncode != 0:
+        return False  # e.g. a relative path that escapes the repo
+    if proc.stdout.strip():
+        return False  # Would delete untracked content
 
     return True
 
 
-def _needs_discord_approval_bash(command: str) -> bool:
+def _scan_commands(command: str) -> Iterator[tuple[str, str]]:
+    """Yield (command, base command name) for each command in a compound command line.
+
+    The base command name is "" when a command is only VAR=value / sudo words.
+    """
+    for m in _SEGMENT_RE.finditer(command):
+        segment = m.group().strip()
+        if segment:
+            base_cmd = _BASE_CMD_RE.match(segment).group(1)
+            # Strip any directory (/bin/rm → rm)
+            yield segment, base_cmd.rpartition("/")[2] if base_cmd else ""
+
+
+def _needs_discord_approval_bash(command: str, cwd: str) -> bool:
     """Check if a Bash command needs Discord approval.
 
     Destructive file commands (rm, etc.) are approved automatically when
     all targets are tracked by git.  Only unrecoverable deletions and
     destructive git operations require Discord approval.
     """
-    # Split compound commands on ||, &&, ;, |, newlines
-    parts = re.split(r"\|\||&&|;|\||\n", command)
-    for part in parts:
-        stripped = part.strip()
-        if not stripped:
-            continue
+    # Most commands contain nothing destructive at all; one scan of the whole
+    # line settles those without splitting or tokenizing it
+    if not _DESTRUCTIVE_HINT_RE.search(command):
+        return False
 
+    # Every destructive git pattern contains "git"; most commands don't, so a
+    # plain substring test lets them skip the regex entirely
+    mentions_git = "git" in command
+    for segment, base_cmd in _scan_commands(command):
         # Git destructive patterns always need approval (destroy uncommitted work)
-        for pattern in DESTRUCTIVE_GIT_PATTERNS:
-            if re.search(pattern, stripped):
-                return True
-
-        # Extract the base command name (skip env vars and sudo)
-        tokens = stripped.split()
-        idx = 0
-        while idx < len(tokens):
-            tok = tokens[idx]
-            if "=" in tok and not tok.startswith("-"):
-                idx += 1
-                continue
-            if tok == "sudo":
-                idx += 1
-                continue
-            break
-        if idx >= len(tokens):
-            continue
-        base_cmd = os.path.basename(tokens[idx])
+        if mentions_git and _DESTRUCTIVE_GIT_RE.search(segment):
+            return True
 
         if base_cmd in DESTRUCTIVE_COMMANDS:
-            targets = _parse_rm_targets(stripped)
-            if not _all_git_recoverable(targets):
+            targets = _parse_rm_targets(segment)
+            if not _all_git_recoverable(targets, cwd):
                 return True
             # All targets git-tracked → recoverable, no approval needed
 
     return False
 
 
-def main() -> None:
-    # Read hook input from stdin
+def _bash_needs_discord(tool_input: dict, cwd: str) -> bool:
+    command = tool_input.get("command", "")
+    if _needs_discord_approval_bash(command, cwd):
+        _log(f"DESTRUCTIVE_BASH: {command}")
+        return True
+    return False
+
+
+# tool_name -> check(tool_input, cwd) telling whether the call needs Discord
+_DISCORD_CHECKS: dict[str, Callable[[dict, str], bool]] = {
+    "AskUserQuestion": lambda tool_input, cwd: True,
+    "Bash": _bash_needs_discord,
+}
+
+
+# Top-level "tool_name": "<name>" in the raw hook JSON (names need no escapes)
+_TOOL_NAME_RE = re.compile(rb'"tool_name"\s*:\s*"([^"\\]*)"')
+
+
+def _extend_json_object(raw: bytes, obj: dict, extra: dict) -> bytes:
+    """Return the JSON text ``raw`` (which decodes to ``obj``) with ``extra`` keys added.
+
+    The new keys are spliced in before the closing brace, so a large tool_input
+    (Write content, long Edit strings) is not re-serialized.
+    """
+    body = raw.rstrip()
+    if obj and body.endswith(b"}") and not obj.keys() & extra.keys():
+        added = "".join(f",{json.dumps(k)}:{json.dumps(v)}" for k, v in extra.items())
+        return b"".join((body[:-1], added.encode(), b"}"))
+    return json.dumps({**obj, **extra}).encode()
+
+
+def _handle(raw: bytes, env: Mapping[str, str], cwd: str) -> str:
+    """Run the hook for one PreToolUse payload and return what it should print.
+
+    ``env`` and ``cwd`` are those of the Claude Code process that fired the
+    hook, so the same logic can run in-process or inside disclaude_gate_hookd.
+    Returns "" when the hook should print nothing (fall through to the terminal).
+    """
+    # Fast path: most calls are auto-allowed tools (Edit/Write payloads can be
+    # hundreds of KB), so sniff tool_name before parsing the whole payload.
+    # Quotes inside JSON strings are escaped, so an unescaped "tool_name" is a
+    # real key; requiring it before "tool_input" rules out nested keys.
+    # The payload stays bytes until it has to be parsed, so auto-allowed calls
+    # never decode it.
+    m = _TOOL_NAME_RE.search(raw)
+    if m:
+        sniffed = m.group(1).decode(errors="replace")
+        tool_input_at = raw.find(b'"tool_input"')
+        if (tool_input_at < 0 or m.start() < tool_input_at) and sniffed not in _DISCORD_CHECKS:
+            _log(f"AUTO_ALLOW tool={sniffed} (sniffed)")
+            return _ALLOW_JSON
+
     try:
-        raw = sys.stdin.read()
         hook_input = json.loads(raw) if raw.strip() else {}
     except (json.JSONDecodeError, Exception):
         _log("PARSE_ERROR: couldn't read stdin")
-        return
+        return ""
 
     tool_name = hook_input.get("tool_name", "")
-    tool_input = hook_input.get("tool_input", {})
-    session_id = hook_input.get("session_id", "")[:8]
-
-    _log(f"START tool={tool_name} session={session_id}")
-
-    # Check if this is a destructive Bash command that needs Discord approval
-    needs_discord = False
-    if tool_name == "AskUserQuestion":
-        needs_discord = True
-    elif tool_name == "Bash":
-        command = tool_input.get("command", "")
-        if _needs_discord_approval_bash(command):
-            _log(f"DESTRUCTIVE_BASH: {command}")
-            needs_discord = True
-
-    # Non-destructive operations are auto-allowed
-    if not needs_discord:
+    _log(f"START tool={tool_name} session={hook_input.get('session_id', '')[:8]}")
+
+    # Tools without a check (the vast majority) are auto-allowed without even
+    # looking at tool_input; Bash is auto-allowed unless destructive
+    check = _DISCORD_CHECKS.get(tool_name)
+    if check is None or not check(hook_input.get("tool_input", {}), cwd):
         _log(f"AUTO_ALLOW tool={tool_name}")
-        print(json.dumps({"decision": "allow"}))
-        return
+        return _ALLOW_JSON
 
     # AskUserQuestion without tmux: can't inject answer remotely,
     # so let Claude Code handle it in the terminal directly.
-    if not os.environ.get("TMUX"):
+    if not env.get("TMUX"):
         _log("SKIP_ASK: no tmux, falling through to terminal")
-        return
+        return ""
 
     # Forward AskUserQuestion to disclaude-gate server for Discord interaction.
-    request_id = str(uuid.uuid4())
-    payload_dict = dict(hook_input)
-    payload_dict["request_id"] = request_id
+    # The server only needs a unique opaque token, not a formatted UUID.
+    request_id = os.urandom(16).hex()
 
-    # Capture tmux pane for remote answer injection
-    try:
-        proc = subprocess.run(
-            ["tmux", "display-message", "-p", "#{pane_id}"],
-            capture_output=True, text=True, timeout=5,
-        )
-        if proc.returncode == 0 and proc.stdout.strip():
-            payload_dict["tmux_pane"] = proc.stdout.strip()
-    except Exception:
-        pass
+    # Capture tmux pane for remote answer injection.  tmux exports TMUX_PANE to
+    # every process in a pane; only ask tmux itself when it is missing.
+    tmux_pane = env.get("TMUX_PANE", "")
+    if not tmux_pane:
+        import subprocess
 
-    payload = json.dumps(payload_dict).encode()
+        try:
+            proc = subprocess.run(
+                ["tmux", "display-message", "-p", "#{pane_id}"],
+                capture_output=True, text=True, timeout=5, env=dict(env),
+            )
+            if proc.returncode == 0:
+                tmux_pane = proc.stdout.strip()
+        except Exception:
+            pass
 
-    req = urllib.request.Request(
-        f"{SERVER_URL}/approve",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    extra = {"request_id": request_id}
+    if tmux_pane:
+        extra["tmux_pane"] = tmux_pane
+    payload = _extend_json_object(raw, hook_input, extra)
 
     _log(f"SENDING to server tool={tool_name}")
+    _flush_log()  # The reply may take minutes; keep the log current meanwhile
     try:
-        with urllib.request.urlopen(req, timeout=600) as resp:
-            raw_resp = resp.read()
-            result = json.loads(raw_resp)
-    except urllib.error.URLError as e:
+        result = _post_json("/approve", payload)
+    except OSError as e:
         # Server not running — fall through to normal CLI prompt
-        _log(f"URL_ERROR: {e}")
+        _log(f"CONNECT_ERROR: {e}")
         print(json.dumps({"error": "disclaude-gate server not reachable"}), file=sys.stderr)
-        return
+        return ""
     except Exception as e:
         _log(f"EXCEPTION: {e}")
-        return
+        return ""
 
     decision = result.get("decision")
     reason = result.get("reason")
     _log(f"RESPONSE tool={tool_name} decision={decision} reason={reason}")
 
     if decision == "allow":
-        output_json = json.dumps({"decision": "allow"})
+        output_json = _ALLOW_JSON
         _log(f"OUTPUT: {output_json}")
-        print(output_json)
+        return output_json
     elif decision == "deny":
-        output: dict = {"decision": "deny"}
-        if reason:
-            output["reason"] = reason
-        output_json = json.dumps(output)
+        output_json = json.dumps({"decision": "deny", "reason": reason}) if reason else _DENY_JSON
         _log(f"OUTPUT: {output_json}")
-        print(output_json)
+        return output_json
     else:
         _log(f"NO_OUTPUT: decision was {decision!r} — falling through")
+        return ""
+
+
+def main() -> None:
+    # Read hook input from stdin
+    try:
+        raw = sys.stdin.buffer.read()
+    except Exception:
+        _log("PARSE_ERROR: couldn't read stdin")
+        _flush_log()
+        return
+
+    try:
+        output = _handle(raw, os.environ, os.getcwd())
+        if output:
+            sys.stdout.write(output + "\n")
+    finally:
+        _flush_log()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+#!/usr/bin/env bash
+# Claude Code PreToolUse hook entry point for disclaude-gate.
+#
+# Forwards the hook to the long-lived hook daemon (disclaude_gate_hookd.py) over
+# a Unix socket, so no Python interpreter starts per tool call.  Falls back to
+# running disclaude_gate_hook.py directly when the daemon or socat is missing.
+
+SOCK="${DISCLAUDE_HOOKD_SOCK:-/tmp/disclaude-hookd.sock}"
+HOOK_DIR="$(dirname "$0")"
+
+# The project venv's interpreter (see README), so the fallback hook runs with
+# the same Python as the daemon; plain python3 when there is no venv
+PYTHON="$HOOK_DIR/../.venv/bin/python3"
+[ -x "$PYTHON" ] || PYTHON=python3
+
+input="$(cat)"
+
+if [ -S "$SOCK" ] && command -v socat &>/dev/null; then
+    # Forwarded requests can wait for a Discord reply, so keep the socket open
+    # for as long as the Python hook's own HTTP timeout (600s).  socat's stdout
+    # goes straight to Claude Code; its stderr is captured to tell a failed
+    # connect from a failure after the request was handed over.
+    { err="$(printf '%s\t%s\t%s\n%s' "${TMUX:-}" "${TMUX_PANE:-}" "$PWD" "$input" \
+        | socat -t 600 - "UNIX-CONNECT:$SOCK" 2>&1 1>&3 3>&-)"; } 3>&1
+    status=$?
+    if [ "$status" -eq 0 ]; then
+        exit 0
+    fi
+    # Once connected, the daemon may already have posted the approval to
+    # Discord (and written output): running the hook again would duplicate
+    # it.  Only a connect failure (stale socket, daemon gone) falls through.
+    case "$err" in
+        *"connect("*) ;;
+        *) printf '%s\n' "$err" >&2; exit "$status" ;;
+    esac
+fi
+
+printf '%s' "$input" | exec "$PYTHON" "$HOOK_DIR/disclaude_gate_hook.py"
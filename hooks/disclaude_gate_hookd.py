@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Long-lived PreToolUse hook daemon for disclaude-gate.
+
+Registering ``python3 disclaude_gate_hook.py`` as the hook cold-starts a Python
+interpreter on every tool call.  This daemon keeps the hook logic loaded and
+serves it over a Unix socket; ``disclaude_gate_hook.sh`` forwards each hook
+invocation here and falls back to the Python hook when the daemon isn't running.
+
+Protocol (one request per connection):
+    client → daemon: "<TMUX>\\t<TMUX_PANE>\\t<cwd>\\n", then the hook's stdin JSON, then EOF
+    daemon → client: the hook's stdout (possibly empty), then close
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import socketserver
+import sys
+
+import disclaude_gate_hook as hook
+
+SOCKET_PATH = os.environ.get("DISCLAUDE_HOOKD_SOCK", "/tmp/disclaude-hookd.sock")
+
+
+class _HookHandler(socketserver.StreamRequestHandler):
+    """Run one hook invocation with the caller's tmux environment and cwd."""
+
+    def handle(self) -> None:
+        header = self.rfile.readline().decode(errors="replace").rstrip("\n")
+        tmux, tmux_pane, cwd = (header.split("\t") + ["", "", ""])[:3]
+        raw = self.rfile.read()
+
+        # The daemon's own environment, but with the caller's tmux identity
+        env = {k: v for k, v in os.environ.items() if k not in ("TMUX", "TMUX_PANE")}
+        if tmux:
+            env["TMUX"] = tmux
+        if tmux_pane:
+            env["TMUX_PANE"] = tmux_pane
+
+        try:
+            output = hook._handle(raw, env, cwd or os.getcwd())
+        except Exception as e:
+            hook._log(f"HOOKD_EXCEPTION: {e}")
+            return
+        finally:
+            hook._flush_log()
+        if output:
+            self.wfile.write(output.encode() + b"\n")
+
+
+def main() -> None:
+    # Remove a stale socket left behind by a previous run
+    try:
+        os.unlink(SOCKET_PATH)
+    except FileNotFoundError:
+        pass
+
+    # Only the current user may connect (the socket lives in shared /tmp)
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(SOCKET_PATH, _HookHandler)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+
+    # Exit through the cleanup below on `kill` / systemd stop as well as Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    hook._log(f"HOOKD listening on {SOCKET_PATH}")
+    hook._flush_log()
+    print(f"disclaude-gate hook daemon listening on {SOCKET_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.unlink(SOCKET_PATH)
+        except FileNotFoundError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
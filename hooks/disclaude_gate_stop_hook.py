@@ -5,18 +5,25 @@ from __future__ import annotations
 
 import json
 import os
-import subprocess
 import sys
-import urllib.error
-import urllib.request
 
-SERVER_URL = "http://127.0.0.1:19280"
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 19280
+# The server's Unix socket, when it also listens on one (skips loopback TCP)
+SERVER_SOCK = os.environ.get("DISCLAUDE_SOCK", "")
 
 
 def _get_tmux_pane() -> str:
     """Get the current tmux pane ID, or empty string if not in tmux."""
     if not os.environ.get("TMUX"):
         return ""
+    # tmux exports TMUX_PANE to every process in a pane; only ask tmux itself
+    # when it is missing
+    pane = os.environ.get("TMUX_PANE", "")
+    if pane:
+        return pane
+    import subprocess
+
     try:
         result = subprocess.run(
             ["tmux", "display-message", "-p", "#{pane_id}"],
@@ -29,7 +36,7 @@ def _get_tmux_pane() -> str:
 
 def main() -> None:
     try:
-        raw = sys.stdin.read()
+        raw = sys.stdin.buffer.read()
         hook_input = json.loads(raw) if raw.strip() else {}
     except (json.JSONDecodeError, Exception):
         return
@@ -42,17 +49,25 @@ def main() -> None:
         "tmux_pane": _get_tmux_pane(),
     }).encode()
 
-    req = urllib.request.Request(
-        f"{SERVER_URL}/notify-stop",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    # http.client directly: urllib.request drags in ssl, email and proxy
+    # handling that a single localhost POST never uses
+    import http.client
 
+    conn = http.client.HTTPConnection(SERVER_HOST, SERVER_PORT, timeout=10)
     try:
-        urllib.request.urlopen(req, timeout=10)
+        if SERVER_SOCK:
+            import socket
+
+            conn.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.sock.settimeout(10)
+            conn.sock.connect(SERVER_SOCK)
+        conn.request("POST", "/notify-stop", body=payload,
+                     headers={"Content-Type": "application/json"})
+        conn.getresponse().read()
     except Exception:
         pass
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
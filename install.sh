@@ -2,7 +2,7 @@
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
-HOOK_PATH="$SCRIPT_DIR/hooks/disclaude_gate_hook.py"
+HOOK_PATH="$SCRIPT_DIR/hooks/disclaude_gate_hook.sh"
 SETTINGS_FILE="$HOME/.claude/settings.json"
 
 echo "=== disclaude-gate installer ==="
@@ -53,7 +53,7 @@ if [ ! -f "$SETTINGS_FILE" ]; then
         "hooks": [
           {
             "type": "command",
-            "command": "python3 $HOOK_PATH"
+            "command": "$HOOK_PATH"
           }
         ]
       }
@@ -77,7 +77,7 @@ else
         echo '          "hooks": ['
         echo '            {'
         echo '              "type": "command",'
-        echo "              \"command\": \"python3 $HOOK_PATH\""
+        echo "              \"command\": \"$HOOK_PATH\""
         echo '            }'
         echo '          ]'
         echo '        }'
@@ -94,5 +94,6 @@ echo ""
 echo "Next steps:"
 echo "  1. Make sure .env has your DISCORD_TOKEN and DISCORD_CHANNEL_ID"
 echo "  2. Start the server:  disclaude-gate"
-echo "  3. Start Claude Code in another terminal — approvals will appear in Discord!"
+echo "  3. (Optional, needs socat) Start the hook daemon:  python3 $SCRIPT_DIR/hooks/disclaude_gate_hookd.py"
+echo "  4. Start Claude Code in another terminal — approvals will appear in Discord!"
 echo ""
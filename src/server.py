@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import hashlib
+import itertools
 import json
 import logging
+import mmap
 import os
-import subprocess
 import sys
-import time
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -16,6 +21,26 @@ import discord
 from aiohttp import web
 from discord import ui
 
+try:
+    import orjson  # optional: pip install -e '.[fast]'
+except ImportError:
+    orjson = None
+
+
+def _json_loads(data: bytes | str):
+    """json.loads for request bodies and transcript lines, via orjson when installed.
+
+    orjson is stricter than json: it rejects a lone surrogate escape such as
+    "\\ud800", which JSON.stringify writes when a string is cut mid-emoji.
+    Input orjson refuses is retried with json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(message)s",
@@ -30,16 +55,20 @@ log = logging.getLogger("disclaude-gate")
 def _load_env() -> None:
     """Load .env file if present (minimal implementation, no extra dependency)."""
     for env_path in (Path.cwd() / ".env", Path(__file__).resolve().parent.parent / ".env"):
-        if env_path.is_file():
-            for line in env_path.read_text().splitlines():
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                key, _, value = line.partition("=")
-                key, value = key.strip(), value.strip()
-                if value and key:
-                    os.environ.setdefault(key, value)
-            break
+        # Just try to read it: a missing file costs one failed open, not a stat too
+        try:
+            f = open(env_path, encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        # One pass over the file's lines: comments dropped, each line split
+        # once; blank lines and lines without "=" end up with an empty key or
+        # value and are skipped.  Variables already in the environment win.
+        with f:
+            pairs = (line.partition("=") for line in f if not line.lstrip().startswith("#"))
+            for key, value in ((k.strip(), v.strip()) for k, _, v in pairs):
+                if value and key and key not in os.environ:
+                    os.environ[key] = value
+        break
 
 
 _load_env()
@@ -56,34 +85,157 @@ def _parse_channel_id(raw: str) -> int:
 
 DISCORD_CHANNEL_ID: int = _parse_channel_id(os.environ.get("DISCORD_CHANNEL_ID", "0"))
 APPROVAL_TIMEOUT: int = int(os.environ.get("APPROVAL_TIMEOUT", "300"))
+_TIMEOUT_FOOTER = f"Timeout: {APPROVAL_TIMEOUT}s"
 PORT: int = int(os.environ.get("PORT", "19280"))
+# Optional Unix socket to serve on as well as TCP (hooks use it when they see the same variable)
+SOCKET_PATH: str = os.environ.get("DISCLAUDE_SOCK", "")
 
 # ---------------------------------------------------------------------------
 # Session color helper
 # ---------------------------------------------------------------------------
 
+# Embed colors, built once (each discord.Color.x() call makes a new object)
+_BLUE = discord.Color.blue()
+_GOLD = discord.Color.gold()
+_GREY = discord.Color.dark_grey()
+_GREEN = discord.Color.green()
+_RED = discord.Color.red()
+
+COLOR_CACHE_MAX = 1024
+
+
+@functools.lru_cache(maxsize=COLOR_CACHE_MAX)
 def _session_color(session_id: str) -> discord.Color:
-    """Generate a stable, visually distinct color from a session ID."""
+    """Generate a stable, visually distinct color from a session ID.
+
+    Derived from a blake2b digest rather than hash(), which is salted per
+    process, so a session keeps its color across server restarts.
+    """
     if not session_id:
-        return discord.Color.gold()
-    h = hash(session_id) & 0xFFFFFF
+        return _GOLD
+    r, g, b = hashlib.blake2b(session_id.encode(), digest_size=3).digest()
     # Boost saturation by keeping values away from grey
-    r = ((h >> 16) & 0xFF) | 0x40
-    g = ((h >> 8) & 0xFF) | 0x40
-    b = (h & 0xFF) | 0x40
-    return discord.Color.from_rgb(r & 0xFF, g & 0xFF, b & 0xFF)
+    return discord.Color.from_rgb(r | 0x40, g | 0x40, b | 0x40)
 
 # ---------------------------------------------------------------------------
 # Session context helpers
 # ---------------------------------------------------------------------------
 
-def _extract_session_context(transcript_path: str, cwd: str) -> tuple[str, str]:
-    """Extract session title and recent conversation context from transcript.
+# (extractor, transcript_path, *args) -> ((st_mtime_ns, st_size), result).
+# Transcripts are append-only, so an unchanged stat means an unchanged result;
+# bursts of approvals from one session then parse the transcript once.
+_transcript_cache: dict[tuple, tuple[tuple[int, int], object]] = {}
+_transcript_cache_lock = threading.Lock()  # Extractors run in executor threads
+TRANSCRIPT_CACHE_MAX = 256
 
-    Returns (session_title, recent_context).
+
+def _cached_per_transcript(fn):
+    """Memoize fn(transcript_path, *args) until the transcript file changes."""
+    @functools.wraps(fn)
+    def wrapper(transcript_path: str, *args):
+        try:
+            st = os.stat(transcript_path)
+        except (OSError, ValueError):
+            return fn(transcript_path, *args)
+        stamp = (st.st_mtime_ns, st.st_size)
+        key = (fn.__name__, transcript_path, *args)
+        with _transcript_cache_lock:
+            hit = _transcript_cache.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+
+        result = fn(transcript_path, *args)
+        with _transcript_cache_lock:
+            _transcript_cache.pop(key, None)  # Re-insert as newest
+            _transcript_cache[key] = (stamp, result)
+            if len(_transcript_cache) > TRANSCRIPT_CACHE_MAX:
+                del _transcript_cache[next(iter(_transcript_cache))]
+        return result
+    return wrapper
+
+
+# (path, index builder) -> ((st_mtime_ns, st_size), index).  Small JSON files
+# (sessions-index.json, team configs) only change when Claude Code rewrites them.
+_json_index_cache: dict[tuple[str, str], tuple[tuple[int, int], dict]] = {}
+
+
+def _load_json_index(path: str | Path, build) -> dict:
+    """Return build(parsed JSON of path), re-reading the file only when it changes.
+
+    Returns {} when the file is missing or can't be parsed.
     """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = (os.fspath(path), build.__name__)
+    hit = _json_index_cache.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    try:
+        with open(path, "rb") as f:
+            index = build(_json_loads(f.read()))
+    except Exception:
+        index = {}
+    _json_index_cache[key] = (stamp, index)
+    return index
+
+
+def _index_sessions(index_data) -> dict[str, str]:
+    """sessions-index.json → {sessionId: summary} (first entry wins)."""
+    summaries: dict[str, str] = {}
+    for session in index_data:
+        if isinstance(session, dict) and isinstance(session.get("summary"), str):
+            summaries.setdefault(session.get("sessionId"), session["summary"][:100])
+    return summaries
+
+
+def _index_team_panes(config) -> dict[str, str]:
+    """Team config.json → {tmuxPaneId: member name}, without the team lead."""
+    panes: dict[str, str] = {}
+    for member in config.get("members", []):
+        if not isinstance(member, dict):
+            continue
+        name = member.get("name", "")
+        # Skip team-lead (it's the main session)
+        if name and name != "team-lead":
+            panes.setdefault(member.get("tmuxPaneId"), name)
+    return panes
+
+
+def _tail_lines(path: str | Path, max_lines: int, window: int = 65536) -> list[bytes]:
+    """Return the last max_lines lines of a file as raw bytes, reading only its tail.
+
+    Lines are left undecoded for the JSON parser (orjson takes bytes as is)
+    and split on b"\n" only; str.splitlines() would also break a JSON line at
+    a raw U+2028 inside a string.
+
+    The window doubles until it holds enough complete lines (transcript lines
+    with large tool results can be much longer than the default window).
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            data = f.read(size - start)
+            # More newlines than lines wanted → enough complete lines after the
+            # partial one at the start of the window
+            if start == 0 or data.count(b"\n") > max_lines:
+                break
+            window *= 2
+    lines = data.split(b"\n")
+    if not lines[-1]:
+        lines.pop()  # Trailing newline
+    if start > 0:
+        lines = lines[1:]  # Starts mid-line
+    return lines[-max_lines:]
+
+
+def _session_title(transcript_path: str, cwd: str) -> str:
+    """Session title from sessions-index.json, else the git repo (or cwd) name."""
     session_title = ""
-    recent_context = ""
 
     # Try to get session title from sessions-index.json
     if transcript_path:
@@ -91,64 +243,144 @@ def _extract_session_context(transcript_path: str, cwd: str) -> tuple[str, str]:
         project_dir = tp.parent
         index_path = project_dir / "sessions-index.json"
         session_id = tp.stem  # filename without .jsonl
-        if index_path.is_file():
-            try:
-                index_data = json.loads(index_path.read_text())
-                for session in index_data:
-                    if session.get("sessionId") == session_id:
-                        session_title = session.get("summary", "")[:100]
-                        break
-            except Exception:
-                pass
+        session_title = _load_json_index(index_path, _index_sessions).get(session_id, "")
 
     # Fallback title: find git repo root name, or use a meaningful cwd segment
     if not session_title and cwd:
-        cwd_path = Path(cwd)
-        # Walk up to find .git directory (repo root)
-        for parent in [cwd_path, *cwd_path.parents]:
-            if (parent / ".git").exists():
-                session_title = parent.name
-                break
-            if parent == parent.parent:
+        session_title = _git_repo_name(cwd)
+
+    return session_title
+
+
+# A session's cwd keeps its repo for the life of the server, so the walk (a
+# stat per ancestor) runs once per cwd rather than on every approval
+@functools.lru_cache(maxsize=256)
+def _git_repo_name(cwd: str) -> str:
+    """Name of the git repo root containing cwd, else cwd's own name."""
+    cwd_path = path = Path(cwd)
+    # Walk up to find .git directory (repo root), stopping at the filesystem root
+    while True:
+        if (path / ".git").exists():
+            return path.name
+        parent = path.parent
+        if parent == path:
+            return cwd_path.name
+        path = parent
+
+
+@_cached_per_transcript
+def _scan_transcript_tail(transcript_path: str) -> tuple[str, str]:
+    """Read the transcript tail once for both recent user messages and Claude's last reply.
+
+    Returns (recent_context, last_assistant_message).  User messages are taken
+    from the last 50 lines, the assistant message from the last 100.
+    """
+    if not transcript_path:
+        return "", ""
+
+    # No is_file() pre-check: opening a missing file fails inside the try below
+    user_messages: list[str] = []
+    last_assistant = ""
+    try:
+        lines = _tail_lines(transcript_path, 100)
+        user_window = len(lines) - 50
+        for i in range(len(lines) - 1, -1, -1):
+            users_done = len(user_messages) >= 2 or i < user_window
+            if users_done and last_assistant:
                 break
-        if not session_title:
-            session_title = cwd_path.name
+            # Parse only lines that can hold a wanted entry: the type value
+            # appears unescaped as "human" / "assistant" (inside a string it
+            # would be escaped), so a miss here can never skip a real match
+            line = lines[i]
+            if (users_done or b'"human"' not in line) and (last_assistant or b'"assistant"' not in line):
+                continue
+            try:
+                entry = _json_loads(line)
+            except ValueError:  # Invalid even for json (see _json_loads), or bad UTF-8
+                continue
+            if not isinstance(entry, dict):
+                continue
+            msg = entry.get("message", {})
+            if not isinstance(msg, dict):
+                continue
 
-    # Extract recent user messages from transcript
-    if transcript_path and Path(transcript_path).is_file():
-        try:
-            lines = Path(transcript_path).read_text().splitlines()
-            # Read last N lines to find recent user messages
-            user_messages: list[str] = []
-            for line in reversed(lines[-50:]):
-                try:
-                    entry = json.loads(line)
-                except (json.JSONDecodeError, Exception):
-                    continue
-                # Claude Code transcript format: entry.type == "human", content in entry.message.content[]
-                if entry.get("type") == "human":
-                    msg = entry.get("message", {})
-                    if not isinstance(msg, dict):
-                        continue
-                    content = msg.get("content", "")
-                    if isinstance(content, list):
-                        texts = [b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text"]
-                        content = " ".join(texts)
-                    if isinstance(content, str) and content.strip():
-                        # Skip system/hook messages
-                        if not content.startswith("{") and not content.startswith("<") and len(content) < 500:
-                            user_messages.append(content.strip())
-                            if len(user_messages) >= 2:
-                                break
-
-            if user_messages:
-                # Most recent first, reverse to chronological
-                user_messages.reverse()
-                recent_context = "\n".join(f"> {msg[:200]}" for msg in user_messages)
-        except Exception:
-            pass
+            # Claude Code transcript format: entry.type == "human" / "assistant",
+            # content in entry.message.content[]
+            entry_type = entry.get("type")
+            if entry_type == "human" and not users_done:
+                content = msg.get("content", "")
+                if isinstance(content, list):
+                    content = " ".join(
+                        b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text"
+                    )
+                if isinstance(content, str) and content.strip():
+                    # Skip system/hook messages (content is non-empty here)
+                    if content[0] not in "{<" and len(content) < 500:
+                        user_messages.append(content.strip())
+            elif entry_type == "assistant" and not last_assistant:
+                content = msg.get("content", [])
+                if isinstance(content, list):
+                    last_assistant = "\n".join(
+                        t for b in content
+                        if isinstance(b, dict) and b.get("type") == "text" and (t := b.get("text", "")).strip()
+                    ).strip()
+    except Exception:
+        pass
+
+    # Most recent first, reverse to chronological
+    user_messages.reverse()
+    recent_context = "\n".join(f"> {msg[:200]}" for msg in user_messages)
+    return recent_context, last_assistant
+
+
+def _extract_session_context(transcript_path: str, cwd: str) -> tuple[str, str]:
+    """Extract session title and recent conversation context from transcript.
+
+    Returns (session_title, recent_context).
+    """
+    return _session_title(transcript_path, cwd), _scan_transcript_tail(transcript_path)[0]
+
+
+def _extract_transcript_info(transcript_path: str, cwd: str) -> tuple[str, str, str]:
+    """Returns (session_title, recent_context, last_assistant_message) from one transcript read."""
+    recent_context, last_assistant = _scan_transcript_tail(transcript_path)
+    return _session_title(transcript_path, cwd), recent_context, last_assistant
+
+
+TEAMS_DIR = os.path.join(os.path.expanduser("~"), ".claude", "teams")
+
+# (TEAMS_DIR st_mtime_ns, config.json paths).  Creating or removing a team
+# directory bumps the parent's mtime; edits inside a config don't, which is
+# why each config still goes through its own stat-keyed _load_json_index.
+_team_configs_cache: tuple[int, list[str]] | None = None
 
-    return session_title, recent_context
+
+def _team_config_paths() -> list[str]:
+    """config.json path of every team directory, re-listed only when TEAMS_DIR changes."""
+    global _team_configs_cache
+    try:
+        mtime = os.stat(TEAMS_DIR).st_mtime_ns
+    except OSError:
+        return []
+    cached = _team_configs_cache
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    # scandir: entry types come from the directory listing itself
+    try:
+        with os.scandir(TEAMS_DIR) as entries:
+            paths = [os.path.join(e.path, "config.json") for e in entries if e.is_dir()]
+    except OSError:
+        return []
+    _team_configs_cache = (mtime, paths)
+    return paths
+
+
+# Subagent transcript path -> task description found in the parent transcript.
+# The parent's task entry is written once, before the subagent starts, so a
+# found description never changes; misses aren't cached (the search repeats).
+_subagent_names: dict[str, str] = {}
+_subagent_names_lock = threading.Lock()  # _extract_agent_name runs in executor threads
+SUBAGENT_NAMES_MAX = 256
 
 
 def _extract_agent_name(transcript_path: str, tmux_pane: str = "") -> str:
@@ -158,24 +390,12 @@ def _extract_agent_name(transcript_path: str, tmux_pane: str = "") -> str:
     1. Match tmux pane ID against team config members (tmux-based Agent Teams)
     2. For Task subagents, read description from parent transcript's queue-operation
     """
-    teams_dir = Path.home() / ".claude" / "teams"
-
     # Strategy 1: Match tmux pane against team config
-    if tmux_pane and teams_dir.is_dir():
-        for team_dir in teams_dir.iterdir():
-            config_path = team_dir / "config.json"
-            if not config_path.is_file():
-                continue
-            try:
-                config = json.loads(config_path.read_text())
-                for member in config.get("members", []):
-                    if member.get("tmuxPaneId") == tmux_pane:
-                        name = member.get("name", "")
-                        # Skip team-lead (it's the main session)
-                        if name and name != "team-lead":
-                            return name
-            except Exception:
-                continue
+    if tmux_pane:
+        for config_path in _team_config_paths():
+            name = _load_json_index(config_path, _index_team_panes).get(tmux_pane)
+            if name:
+                return name
 
     if not transcript_path:
         return ""
@@ -183,83 +403,124 @@ def _extract_agent_name(transcript_path: str, tmux_pane: str = "") -> str:
 
     # Strategy 2: Task subagent — read description from parent transcript
     if tp.parent.name == "subagents":
+        desc = _subagent_names.get(transcript_path)
+        if desc:
+            return desc
         agent_id = tp.stem.replace("agent-", "")
         if agent_id and not agent_id.startswith("compact"):
             # Parent transcript: {session_id}.jsonl in grandparent directory
             parent_transcript = tp.parent.parent.parent / f"{tp.parent.parent.name}.jsonl"
-            if parent_transcript.is_file():
-                needle = f'"task_id":"{agent_id}"'
-                try:
-                    with open(parent_transcript) as f:
-                        for line in f:
-                            if needle not in line:
-                                continue
-                            entry = json.loads(line)
-                            content = entry.get("content", "")
-                            if isinstance(content, str) and "description" in content:
-                                inner = json.loads(content)
-                                desc = inner.get("description", "")
-                                if desc:
-                                    return desc
-                            break  # found the task entry, stop searching
-                except Exception:
-                    pass
+            needle = f'"task_id":"{agent_id}"'.encode()
+            try:
+                # One C-level search over the mapped file, then parse only the
+                # line holding the task entry.  A missing parent transcript
+                # fails the open; an empty one can't be mapped.
+                with open(parent_transcript, "rb") as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    idx = mm.find(needle)
+                    if idx >= 0:
+                        end = mm.find(b"\n", idx)
+                        line = mm[mm.rfind(b"\n", 0, idx) + 1:end if end >= 0 else len(mm)]
+                    else:
+                        line = b""
+                if line:
+                    entry = _json_loads(line)
+                    content = entry.get("content", "")
+                    if isinstance(content, str) and "description" in content:
+                        inner = _json_loads(content)
+                        desc = inner.get("description", "")
+                        if desc:
+                            with _subagent_names_lock:
+                                _remember(_subagent_names, transcript_path, desc, SUBAGENT_NAMES_MAX)
+                            return desc
+            except Exception:
+                pass
 
     return ""
 
 
-def _extract_last_assistant_message(transcript_path: str) -> str:
-    """Extract the last assistant text message from the transcript."""
-    if not transcript_path or not Path(transcript_path).is_file():
-        return ""
-    try:
-        lines = Path(transcript_path).read_text().splitlines()
-        for line in reversed(lines[-100:]):
-            try:
-                entry = json.loads(line)
-            except (json.JSONDecodeError, Exception):
-                continue
-            # Transcript format: entry.type == "assistant", content in entry.message.content[]
-            if entry.get("type") == "assistant":
-                msg = entry.get("message", {})
-                if not isinstance(msg, dict):
-                    continue
-                content = msg.get("content", [])
-                if isinstance(content, list):
-                    texts = [b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text"]
-                    result = "\n".join(t for t in texts if t.strip())
-                    if result.strip():
-                        return result.strip()
-    except Exception:
-        pass
-    return ""
+def _extract_session_and_agent(
+    transcript_path: str, cwd: str, tmux_pane: str = "",
+) -> tuple[str, str, str]:
+    """Returns (session_title, recent_context, agent_name) in one executor hop."""
+    session_title, recent_context = _extract_session_context(transcript_path, cwd)
+    return session_title, recent_context, _extract_agent_name(transcript_path, tmux_pane)
 
 # ---------------------------------------------------------------------------
 # Thread management — one Discord thread per session
 # ---------------------------------------------------------------------------
 
-# session_id -> discord.Thread
+# session_id -> discord.Thread.  Sessions whose Stop hook never arrives
+# (crash, killed terminal) are never archived, so the map is capped.
 _session_threads: dict[str, discord.Thread] = {}
+SESSION_THREADS_MAX = 512
+
+
+def _remember(store: dict, key, value, cap: int) -> None:
+    """store[key] = value as the newest entry, evicting the oldest beyond cap."""
+    store.pop(key, None)
+    store[key] = value
+    if len(store) > cap:
+        evicted = next(iter(store))
+        del store[evicted]
+        log.debug("Evicted %r (over %d entries)", evicted, cap)
+
+
+# channel id -> {thread name -> thread}; filled by a scan of the channel's
+# active and archived threads, then kept current by the thread events below.
+# A miss rescans at most every THREAD_RESCAN_INTERVAL seconds, for changes the
+# events don't cover (e.g. an archived thread renamed elsewhere).
+_thread_name_cache: dict[int, dict[str, discord.Thread]] = {}
+_thread_name_scanned: dict[int, float] = {}  # channel id -> loop time of last scan
+THREAD_RESCAN_INTERVAL = 60.0
+
+
+def _forget_thread(parent_id: int | None, thread_id: int) -> None:
+    """Drop a deleted thread from the name cache and the session map."""
+    by_name = _thread_name_cache.get(parent_id)
+    if by_name:
+        for name, thread in list(by_name.items()):
+            if thread.id == thread_id:
+                del by_name[name]
+    for session_id, thread in list(_session_threads.items()):
+        if thread.id == thread_id:
+            del _session_threads[session_id]
 
 
 async def _find_existing_thread(
     channel: discord.TextChannel, thread_name: str,
 ) -> discord.Thread | None:
     """Search for an existing (possibly archived) thread by name."""
-    # Check active threads
-    for thread in channel.threads:
-        if thread.name == thread_name:
-            if thread.archived:
-                await thread.edit(archived=False)
-            return thread
-
-    # Check archived threads
-    async for thread in channel.archived_threads(limit=50):
-        if thread.name == thread_name:
+    by_name = _thread_name_cache.get(channel.id)
+    now = asyncio.get_running_loop().time()
+    if by_name is None or (
+        thread_name not in by_name
+        and now - _thread_name_scanned.get(channel.id, 0.0) >= THREAD_RESCAN_INTERVAL
+    ):
+        # One archived-threads listing per channel (and interval), instead of
+        # one per session whose thread isn't in _session_threads yet
+        by_name = {}
+        async for thread in channel.archived_threads(limit=100):
+            by_name.setdefault(thread.name, thread)
+        # Active threads take precedence over archived ones of the same name
+        for thread in channel.threads:
+            by_name[thread.name] = thread
+        _thread_name_cache[channel.id] = by_name
+        _thread_name_scanned[channel.id] = now
+
+    thread = by_name.get(thread_name)
+    if thread is None:
+        return None
+    # The cached object may be stale; prefer the client's live copy
+    thread = channel.get_thread(thread.id) or thread
+    if thread.archived:
+        try:
             await thread.edit(archived=False)
-            return thread
-
-    return None
+        except discord.NotFound:
+            # Deleted while the gateway was down (no delete event arrived)
+            _forget_thread(channel.id, thread.id)
+            return None
+    return thread
 
 
 async def _get_or_create_thread(
@@ -274,18 +535,18 @@ async def _get_or_create_thread(
             # Unarchive if needed
             await thread.edit(archived=False)
             return thread
+        except discord.NotFound:
+            _forget_thread(channel.id, thread.id)
         except Exception:
             pass
 
-    thread_name = session_title or session_id[:12]
     # Discord thread name limit is 100 chars
-    if len(thread_name) > 100:
-        thread_name = thread_name[:97] + "..."
+    thread_name = _ellipsize(session_title or session_id[:12], 100)
 
     # Try to reuse existing thread with same name
     thread = await _find_existing_thread(channel, thread_name)
     if thread:
-        _session_threads[session_id] = thread
+        _remember(_session_threads, session_id, thread, SESSION_THREADS_MAX)
         log.info("Reusing thread '%s' for session %s", thread_name, session_id[:8])
         return thread
 
@@ -294,11 +555,32 @@ async def _get_or_create_thread(
         type=discord.ChannelType.public_thread,
         auto_archive_duration=60,
     )
-    _session_threads[session_id] = thread
+    _remember(_session_threads, session_id, thread, SESSION_THREADS_MAX)
+    _thread_name_cache.setdefault(channel.id, {})[thread_name] = thread
     log.info("Created thread '%s' for session %s", thread_name, session_id[:8])
     return thread
 
 
+async def _send_to_session_thread(
+    channel: discord.TextChannel, session_id: str, session_title: str, **kwargs,
+) -> tuple[discord.Thread, discord.Message]:
+    """thread.send(**kwargs) to the session's thread, returning (thread, message).
+
+    A cached thread may have been deleted without a delete event reaching us
+    (e.g. while the gateway was down).  Sending to it raises NotFound: forget
+    it, rescan the channel and send to the thread found or created instead.
+    """
+    thread = await _get_or_create_thread(channel, session_id, session_title)
+    try:
+        return thread, await thread.send(**kwargs)
+    except discord.NotFound:
+        log.warning("Thread %s no longer exists; finding or creating another", thread.id)
+        _forget_thread(channel.id, thread.id)
+        _thread_name_scanned.pop(channel.id, None)
+        thread = await _get_or_create_thread(channel, session_id, session_title)
+        return thread, await thread.send(**kwargs)
+
+
 async def _archive_thread(session_id: str) -> None:
     """Archive the thread for a completed session."""
     thread = _session_threads.pop(session_id, None)
@@ -318,19 +600,42 @@ class PendingRequest:
     request_id: str
     tool_name: str
     tool_input: dict
-    event: asyncio.Event = field(default_factory=asyncio.Event)
-    decision: str | None = None       # "allow" | "deny"
-    reason: str | None = None
+    # Resolves to (decision, reason); decision is "allow" | "deny", or None
+    # when the prompt could not be posted (reason then holds the error)
+    future: asyncio.Future[tuple[str | None, str | None]] = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future(),
+    )
+    # Handlers still holding the request: the one that posts its prompt, plus
+    # any hook retries waiting on it
+    waiters: int = 0
+
+    def resolve(self, decision: str | None, reason: str | None = None) -> None:
+        """Settle the request; the first answer wins and later ones are ignored."""
+        if not self.future.done():
+            self.future.set_result((decision, reason))
 
 
-# request_id -> PendingRequest
+# request_id -> PendingRequest.  Not capped: the last handler holding a request
+# removes it (see _release_pending), so this only holds requests still in flight.
 _pending: dict[str, PendingRequest] = {}
 
+
+def _release_pending(req: PendingRequest) -> None:
+    """Drop one handler's hold on req; forget req once answered or unwaited."""
+    req.waiters -= 1
+    if (req.waiters <= 0 or req.future.done()) and _pending.get(req.request_id) is req:
+        del _pending[req.request_id]
+
+# Session sets, kept as insertion-ordered dicts (session_id -> None) so the
+# oldest sessions can be dropped once SESSION_TRACK_MAX is exceeded; normally
+# handle_stop removes a session when it finishes.
+SESSION_TRACK_MAX = 1024
+
 # Sessions that have had at least one approval request go through
-_sessions_with_approvals: set[str] = set()
+_sessions_with_approvals: dict[str, None] = {}
 
 # Sessions where user has chosen "Allow All" — auto-approve everything
-_auto_allow_sessions: set[str] = set()
+_auto_allow_sessions: dict[str, None] = {}
 
 # ---------------------------------------------------------------------------
 # Discord UI components
@@ -342,8 +647,13 @@ async def _mark_resolved(
     status: str,
     color: discord.Color,
     detail: str = "",
+    interaction: discord.Interaction | None = None,
 ) -> None:
-    """Update the original approval message to show it's been resolved."""
+    """Update the original approval message to show it's been resolved.
+
+    Pass the button interaction (not yet responded to) to make the edit its
+    response: one REST call instead of defer() followed by msg.edit().
+    """
     # Update embed: prepend status, change color, add detail
     embed = msg.embeds[0] if msg.embeds else discord.Embed()
     embed.title = f"{status} {embed.title or ''}"
@@ -353,6 +663,20 @@ async def _mark_resolved(
     # Disable all buttons
     for item in view.children:
         item.disabled = True
+    if interaction is not None:
+        try:
+            await interaction.response.edit_message(embed=embed, view=view)
+            log.debug("_mark_resolved: updated message (status=%s)", status)
+            return
+        except Exception:
+            log.warning("_mark_resolved: interaction edit failed, editing the message instead", exc_info=True)
+        # The decision is already recorded: still acknowledge the click, so
+        # the user doesn't see "This interaction failed"
+        if not interaction.response.is_done():
+            try:
+                await interaction.response.defer()
+            except Exception:
+                log.debug("_mark_resolved: could not acknowledge interaction", exc_info=True)
     try:
         await msg.edit(embed=embed, view=view)
         log.debug("_mark_resolved: updated message (status=%s)", status)
@@ -360,16 +684,28 @@ async def _mark_resolved(
         log.exception("_mark_resolved: failed to update message")
 
 
-class ReplyModal(ui.Modal, title="Reply to Claude"):
-    """Modal for typing a custom reply message."""
+class _MessageModal(ui.Modal, title="Reply to Claude"):
+    """Base for the reply modals: one paragraph field; subclasses set the
+    placeholder and implement on_submit."""
+
+    placeholder = ""
 
     message = ui.TextInput(
         label="Message",
         style=discord.TextStyle.paragraph,
-        placeholder="e.g. Don't delete that file — read it first.",
         max_length=1000,
     )
 
+    def __init__(self) -> None:
+        super().__init__()
+        self.message.placeholder = self.placeholder  # Per-instance copy of the field
+
+
+class ReplyModal(_MessageModal):
+    """Modal for typing a custom reply message."""
+
+    placeholder = "e.g. Don't delete that file — read it first."
+
     def __init__(self, request_id: str, original_message: discord.Message | None = None,
                  parent_view: ui.View | None = None) -> None:
         super().__init__()
@@ -382,129 +718,165 @@ class ReplyModal(ui.Modal, title="Reply to Claude"):
         if req is None:
             await interaction.response.send_message("This request has already expired.", ephemeral=True)
             return
-        req.decision = "deny"
-        req.reason = str(self.message)
-        req.event.set()
+        req.resolve("deny", str(self.message))
         await interaction.response.send_message(
-            embed=discord.Embed(description=f"Replied: {self.message}", color=discord.Color.blue()),
+            embed=discord.Embed(description=f"Replied: {self.message}", color=_BLUE),
         )
         if self.original_message and self.parent_view:
             await _mark_resolved(self.original_message, self.parent_view,
-                                 "\U0001f4ac", discord.Color.blue(), str(self.message)[:200])
+                                 "\U0001f4ac", _BLUE, str(self.message)[:200])
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    """Kill a hung tmux and reap it, so no zombie or open transport is left."""
+    try:
+        proc.kill()
+    except ProcessLookupError:
+        pass
+    await proc.wait()
+
+
+async def _tmux_keys(tmux_pane: str, *keys: str) -> None:
+    """Run `tmux send-keys -t <pane> <keys...>`; raise if it fails or hangs.
+
+    An asyncio subprocess rather than subprocess.run in an executor, so a
+    keystroke doesn't tie up a thread-pool worker while tmux runs.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "tmux", "send-keys", "-t", tmux_pane, *keys,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+    )
+    try:
+        returncode = await asyncio.wait_for(proc.wait(), timeout=5)
+    except asyncio.TimeoutError:
+        await _kill(proc)
+        raise
+    if returncode != 0:
+        raise RuntimeError(f"tmux send-keys exited with {returncode}")
+
+
+async def _tmux_capture(tmux_pane: str) -> bytes | None:
+    """Visible contents of a tmux pane, or None if it can't be captured."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "tmux", "capture-pane", "-p", "-t", tmux_pane,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+    except Exception:
+        return None
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout=5)
+    except asyncio.TimeoutError:
+        await _kill(proc)
+        return None
+    except Exception:
+        return None
+    return out if proc.returncode == 0 else None
+
+
+async def _tmux_wait_settled(
+    tmux_pane: str, before: bytes | None, timeout: float = 1.5, quiet: float = 0.2,
+) -> None:
+    """Wait until the pane has changed from `before` and then stayed unchanged
+    for `quiet` seconds (the next prompt has rendered), or until `timeout`.
+
+    Falls back to sleeping out the timeout when the pane can't be captured.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    last, last_change = before, None
+    while loop.time() < deadline:
+        await asyncio.sleep(0.05)
+        current = await _tmux_capture(tmux_pane)
+        if current is None or before is None:
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            return
+        if current != last:
+            last, last_change = current, loop.time()
+        elif last_change is not None and loop.time() - last_change >= quiet:
+            return
 
 
-def _tmux_send_keys(tmux_pane: str, text: str) -> bool:
+async def _tmux_send_keys(tmux_pane: str, text: str) -> bool:
     """Send text to a tmux pane as keyboard input."""
     try:
         # Use -l (literal) to send text, then Enter separately
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_pane, "-l", text],
-            capture_output=True, timeout=5, check=True,
-        )
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_pane, "Enter"],
-            capture_output=True, timeout=5, check=True,
-        )
+        await _tmux_keys(tmux_pane, "-l", text)
+        await _tmux_keys(tmux_pane, "Enter")
         return True
     except Exception:
         return False
 
 
-def _tmux_send_enter(tmux_pane: str) -> bool:
+async def _tmux_send_enter(tmux_pane: str) -> bool:
     """Send just Enter key to a tmux pane (for confirming UI selections)."""
     try:
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_pane, "Enter"],
-            capture_output=True, timeout=5, check=True,
-        )
+        await _tmux_keys(tmux_pane, "Enter")
         return True
     except Exception:
         return False
 
 
-def _tmux_select_option(tmux_pane: str, option_index: int) -> bool:
+async def _tmux_press(tmux_pane: str, keys: list[str], gap: float = 0.05) -> None:
+    """Press keys one send-keys call at a time, `gap` seconds apart.
+
+    Not one call for all of them: tmux would write the keys to the pty in a
+    single burst, and Claude Code's prompt can read a burst of escape
+    sequences as one unknown key.
+    """
+    for i, key in enumerate(keys):
+        if i:
+            await asyncio.sleep(gap)
+        await _tmux_keys(tmux_pane, key)
+
+
+async def _tmux_select_option(tmux_pane: str, option_index: int) -> bool:
     """Select option at given index in an interactive CLI prompt via tmux arrow keys."""
     try:
-        for _ in range(option_index):
-            subprocess.run(
-                ["tmux", "send-keys", "-t", tmux_pane, "Down"],
-                capture_output=True, timeout=5, check=True,
-            )
-            time.sleep(0.05)
-        time.sleep(0.1)
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_pane, "Enter"],
-            capture_output=True, timeout=5, check=True,
-        )
+        await _tmux_press(tmux_pane, ["Down"] * option_index)
+        await asyncio.sleep(0.1)  # Settle before confirming
+        await _tmux_keys(tmux_pane, "Enter")
         return True
     except Exception:
         return False
 
 
-def _tmux_select_multi_options(tmux_pane: str, option_indices: list[int]) -> bool:
+async def _tmux_select_multi_options(tmux_pane: str, option_indices: list[int]) -> bool:
     """Toggle multiple options in a multi-select prompt and submit via tmux."""
     try:
+        keys: list[str] = []
         current_pos = 0
         for idx in sorted(option_indices):
-            moves = idx - current_pos
-            for _ in range(moves):
-                subprocess.run(
-                    ["tmux", "send-keys", "-t", tmux_pane, "Down"],
-                    capture_output=True, timeout=5, check=True,
-                )
-                time.sleep(0.05)
-            subprocess.run(
-                ["tmux", "send-keys", "-t", tmux_pane, "Space"],
-                capture_output=True, timeout=5, check=True,
-            )
-            time.sleep(0.05)
+            keys += ["Down"] * (idx - current_pos)
+            keys.append("Space")
             current_pos = idx
-        time.sleep(0.1)
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_pane, "Enter"],
-            capture_output=True, timeout=5, check=True,
-        )
+        await _tmux_press(tmux_pane, keys)
+        await asyncio.sleep(0.1)  # Settle before confirming
+        await _tmux_keys(tmux_pane, "Enter")
         return True
     except Exception:
         return False
 
 
-def _tmux_type_other_option(tmux_pane: str, text: str, num_options: int) -> bool:
+async def _tmux_type_other_option(tmux_pane: str, text: str, num_options: int) -> bool:
     """Select 'Other' option and type custom text via tmux."""
     try:
         # Navigate past all defined options to reach 'Other'
-        for _ in range(num_options):
-            subprocess.run(
-                ["tmux", "send-keys", "-t", tmux_pane, "Down"],
-                capture_output=True, timeout=5, check=True,
-            )
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_pane, "Enter"],
-            capture_output=True, timeout=5, check=True,
-        )
-        time.sleep(0.2)  # Wait for text input prompt
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_pane, "-l", text],
-            capture_output=True, timeout=5, check=True,
-        )
-        subprocess.run(
-            ["tmux", "send-keys", "-t", tmux_pane, "Enter"],
-            capture_output=True, timeout=5, check=True,
-        )
+        await _tmux_press(tmux_pane, ["Down"] * num_options)
+        await asyncio.sleep(0.1)  # Settle before confirming
+        await _tmux_keys(tmux_pane, "Enter")
+        await asyncio.sleep(0.2)  # Wait for text input prompt
+        await _tmux_keys(tmux_pane, "-l", text)
+        await _tmux_keys(tmux_pane, "Enter")
         return True
     except Exception:
         return False
 
 
-class StopReplyModal(ui.Modal, title="Reply to Claude"):
+class StopReplyModal(_MessageModal):
     """Modal for typing a reply to a stopped Claude session via tmux."""
 
-    message = ui.TextInput(
-        label="Message",
-        style=discord.TextStyle.paragraph,
-        placeholder="e.g. Yes, go ahead / Use approach A",
-        max_length=1000,
-    )
+    placeholder = "e.g. Yes, go ahead / Use approach A"
 
     def __init__(self, tmux_pane: str) -> None:
         super().__init__()
@@ -512,10 +884,9 @@ class StopReplyModal(ui.Modal, title="Reply to Claude"):
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
         text = str(self.message).strip()
-        loop = asyncio.get_running_loop()
-        success = await loop.run_in_executor(None, _tmux_send_keys, self.tmux_pane, text)
+        success = await _tmux_send_keys(self.tmux_pane, text)
         if success:
-            embed = discord.Embed(description=f"Sent: {text}", color=discord.Color.blue())
+            embed = discord.Embed(description=f"Sent: {text}", color=_BLUE)
             await interaction.response.send_message(embed=embed)
         else:
             await interaction.response.send_message("Failed to send to tmux pane.", ephemeral=True)
@@ -528,33 +899,58 @@ class StopView(ui.View):
         super().__init__(timeout=APPROVAL_TIMEOUT)
         self.tmux_pane = tmux_pane
 
-    async def _send_and_resolve(self, interaction: discord.Interaction, label: str, keys_fn) -> None:
-        loop = asyncio.get_running_loop()
-        success = await loop.run_in_executor(None, keys_fn)
+    async def _send_and_resolve(
+        self, interaction: discord.Interaction, label: str,
+        send_keys: Callable[..., Awaitable[bool]], *args,
+    ) -> None:
+        # Acknowledge first: tmux may take up to its timeout, and Discord drops
+        # interactions not answered within 3 seconds.  send_keys(*args) is only
+        # called once that succeeded, so a failed defer() leaves no coroutine behind.
+        await interaction.response.defer()
+        success = await send_keys(*args)
         if success:
-            await interaction.response.defer()
-            await _mark_resolved(interaction.message, self, "\U0001f4ac", discord.Color.blue(), label)
+            await _mark_resolved(interaction.message, self, "\U0001f4ac", _BLUE, label)
         else:
-            await interaction.response.send_message("Failed to send to tmux pane.", ephemeral=True)
+            await interaction.followup.send("Failed to send to tmux pane.", ephemeral=True)
         self.stop()
 
     @ui.button(label="Yes", style=discord.ButtonStyle.success)
     async def yes(self, interaction: discord.Interaction, button: ui.Button) -> None:
         # Enter confirms the default (first) option
-        await self._send_and_resolve(interaction, "Yes",
-            lambda: _tmux_send_enter(self.tmux_pane))
+        await self._send_and_resolve(interaction, "Yes", _tmux_send_enter, self.tmux_pane)
 
     @ui.button(label="No", style=discord.ButtonStyle.danger)
     async def no(self, interaction: discord.Interaction, button: ui.Button) -> None:
         # Navigate down to "No" option, then confirm
-        await self._send_and_resolve(interaction, "No",
-            lambda: _tmux_select_option(self.tmux_pane, 1))
+        await self._send_and_resolve(interaction, "No", _tmux_select_option, self.tmux_pane, 1)
 
     @ui.button(label="Reply", style=discord.ButtonStyle.primary, emoji="\U0001f4ac")
     async def reply(self, interaction: discord.Interaction, button: ui.Button) -> None:
         await interaction.response.send_modal(StopReplyModal(self.tmux_pane))
 
 
+# Fixed buttons shared by both AskUserQuestion views (each adds its own custom_id)
+def _submit_button(custom_id: str) -> ui.Button:
+    return ui.Button(label="Submit", style=discord.ButtonStyle.success, emoji="\u2705", custom_id=custom_id)
+
+
+def _other_button(custom_id: str) -> ui.Button:
+    return ui.Button(label="Other", style=discord.ButtonStyle.secondary, emoji="\U0001f4ac", custom_id=custom_id)
+
+
+def _ellipsize(text: str, limit: int) -> str:
+    """Fit text into a Discord length limit, marking a cut with "..."."""
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _select_option_texts(options: list[dict]) -> list[tuple[str, str]]:
+    """(label, description) for the first 25 options, fitted to select-menu limits."""
+    return [
+        (_ellipsize(opt.get("label", f"Option {oi + 1}"), 100), _ellipsize(opt.get("description", ""), 100))
+        for oi, opt in enumerate(options[:25])
+    ]
+
+
 class AskUserQuestionView(ui.View):
     """Handles AskUserQuestion — single-question uses buttons, multi-question uses dropdowns."""
 
@@ -565,19 +961,20 @@ class AskUserQuestionView(ui.View):
         self._answers: dict[int, str] = {}  # question index -> selected label(s)
         self._question_count = len(questions)
 
+        self._option_labels: list[str] = []  # button index -> label
+
         if len(questions) <= 1:
             # Single question — use buttons (original behavior)
             options = questions[0].get("options", []) if questions else []
             for i, opt in enumerate(options[:20]):
-                label = opt.get("label", f"Option {i + 1}")
-                if len(label) > 80:
-                    label = label[:77] + "..."
+                label = _ellipsize(opt.get("label", f"Option {i + 1}"), 80)
+                self._option_labels.append(label)
                 button = ui.Button(
                     label=label,
                     style=discord.ButtonStyle.primary,
                     custom_id=f"ask_{request_id[:8]}_{i}",
                 )
-                button.callback = self._make_button_callback(label)
+                button.callback = self._option_callback
                 self.add_item(button)
         else:
             # Multi-question — use Select menus (dropdowns)
@@ -586,19 +983,10 @@ class AskUserQuestionView(ui.View):
                 options = q.get("options", [])
                 is_multi = q.get("multiSelect", False)
                 header = q.get("header", f"Q{qi + 1}")
-                select_options = []
-                for oi, opt in enumerate(options[:25]):
-                    label = opt.get("label", f"Option {oi + 1}")
-                    desc = opt.get("description", "")
-                    if len(label) > 100:
-                        label = label[:97] + "..."
-                    if len(desc) > 100:
-                        desc = desc[:97] + "..."
-                    select_options.append(discord.SelectOption(
-                        label=label,
-                        description=desc or None,
-                        value=label,
-                    ))
+                select_options = [
+                    discord.SelectOption(label=label, description=desc or None, value=label)
+                    for label, desc in _select_option_texts(options)
+                ]
                 select = ui.Select(
                     placeholder=f"{header}: {q.get('question', '')[:90]}",
                     options=select_options,
@@ -609,42 +997,29 @@ class AskUserQuestionView(ui.View):
                 select.callback = self._make_select_callback(qi)
                 self.add_item(select)
             # Submit button in the last row
-            submit_btn = ui.Button(
-                label="Submit",
-                style=discord.ButtonStyle.success,
-                emoji="\u2705",
-                custom_id=f"ask_{request_id[:8]}_submit",
-            )
+            submit_btn = _submit_button(f"ask_{request_id[:8]}_submit")
             submit_btn.callback = self._submit_callback
             self.add_item(submit_btn)
 
         # Free-text reply button (always present)
-        reply_btn = ui.Button(
-            label="Other",
-            style=discord.ButtonStyle.secondary,
-            emoji="\U0001f4ac",
-            custom_id=f"ask_{request_id[:8]}_reply",
-        )
+        reply_btn = _other_button(f"ask_{request_id[:8]}_reply")
         reply_btn.callback = self._reply_callback
         self.add_item(reply_btn)
 
-    # -- Single question: button callbacks --
+    # -- Single question: button callback (shared; the custom_id ends in the option index) --
 
-    def _make_button_callback(self, label: str):
-        async def callback(interaction: discord.Interaction) -> None:
-            req = _pending.get(self.request_id)
-            if req is None:
-                await interaction.response.send_message("This request has already expired.", ephemeral=True)
-                return
-            req.decision = "deny"
-            req.reason = label
-            req.event.set()
-            await interaction.response.send_message(
-                embed=discord.Embed(description=f"Selected: {label}", color=discord.Color.blue()),
-            )
-            await _mark_resolved(interaction.message, self, "\U0001f4ac", discord.Color.blue(), label)
-            self.stop()
-        return callback
+    async def _option_callback(self, interaction: discord.Interaction) -> None:
+        req = _pending.get(self.request_id)
+        if req is None:
+            await interaction.response.send_message("This request has already expired.", ephemeral=True)
+            return
+        label = self._option_labels[int(interaction.data["custom_id"].rsplit("_", 1)[1])]
+        req.resolve("deny", label)
+        await interaction.response.send_message(
+            embed=discord.Embed(description=f"Selected: {label}", color=_BLUE),
+        )
+        await _mark_resolved(interaction.message, self, "\U0001f4ac", _BLUE, label)
+        self.stop()
 
     # -- Multi-question: select + submit callbacks --
 
@@ -670,13 +1045,11 @@ class AskUserQuestionView(ui.View):
         # Format all answers as text
         parts = [f"Q{i + 1}: {self._answers[i]}" for i in sorted(self._answers)]
         combined = "\n".join(parts)
-        req.decision = "deny"
-        req.reason = combined
-        req.event.set()
+        req.resolve("deny", combined)
         await interaction.response.send_message(
-            embed=discord.Embed(description=f"Submitted:\n{combined}", color=discord.Color.blue()),
+            embed=discord.Embed(description=f"Submitted:\n{combined}", color=_BLUE),
         )
-        await _mark_resolved(interaction.message, self, "\U0001f4ac", discord.Color.blue(),
+        await _mark_resolved(interaction.message, self, "\U0001f4ac", _BLUE,
                              combined[:200])
         self.stop()
 
@@ -689,23 +1062,16 @@ class AskUserQuestionView(ui.View):
 
     async def on_timeout(self) -> None:
         req = _pending.get(self.request_id)
-        if req and not req.event.is_set():
-            req.decision = "deny"
-            req.reason = "Timed out waiting for response"
-            req.event.set()
+        if req and not req.future.done():
+            req.resolve("deny", "Timed out waiting for response")
             if self._original_message:
-                await _mark_resolved(self._original_message, self, "\u23f0", discord.Color.dark_grey())
+                await _mark_resolved(self._original_message, self, "\u23f0", _GREY)
 
 
-class AskQuestionTmuxReplyModal(ui.Modal, title="Reply to Claude"):
+class AskQuestionTmuxReplyModal(_MessageModal):
     """Modal for typing a custom answer that gets injected via tmux."""
 
-    message = ui.TextInput(
-        label="Message",
-        style=discord.TextStyle.paragraph,
-        placeholder="Type your answer...",
-        max_length=1000,
-    )
+    placeholder = "Type your answer..."
 
     def __init__(self, tmux_pane: str, num_options: int,
                  original_message: discord.Message | None = None,
@@ -718,19 +1084,21 @@ class AskQuestionTmuxReplyModal(ui.Modal, title="Reply to Claude"):
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
         text = str(self.message).strip()
-        loop = asyncio.get_running_loop()
-        success = await loop.run_in_executor(
-            None, _tmux_type_other_option, self.tmux_pane, text, self.num_options
-        )
+        await interaction.response.defer()  # Before tmux (see StopView._send_and_resolve)
+        success = await _tmux_type_other_option(self.tmux_pane, text, self.num_options)
         if success:
-            await interaction.response.defer()
             if self.original_message and self.parent_view:
                 await _mark_resolved(
                     self.original_message, self.parent_view,
-                    "\U0001f4ac", discord.Color.blue(), text[:200]
+                    "\U0001f4ac", _BLUE, text[:200]
                 )
         else:
-            await interaction.response.send_message("Failed to send to tmux.", ephemeral=True)
+            await interaction.followup.send("Failed to send to tmux.", ephemeral=True)
+
+
+# Per-view prefix for custom_ids: these views have no request id, and a
+# counter is shorter than id(self), which can also be reused once a view is freed
+_tmux_view_ids = itertools.count()
 
 
 class AskQuestionTmuxView(ui.View):
@@ -739,6 +1107,7 @@ class AskQuestionTmuxView(ui.View):
     def __init__(self, tmux_pane: str, questions: list[dict]) -> None:
         super().__init__(timeout=APPROVAL_TIMEOUT)
         self.tmux_pane = tmux_pane
+        prefix = f"tmux_ask_{next(_tmux_view_ids)}"
         self._original_message: discord.Message | None = None
         self._questions = questions
 
@@ -746,13 +1115,11 @@ class AskQuestionTmuxView(ui.View):
             # Single question — buttons for each option
             options = questions[0].get("options", []) if questions else []
             for i, opt in enumerate(options[:20]):
-                label = opt.get("label", f"Option {i + 1}")
-                if len(label) > 80:
-                    label = label[:77] + "..."
+                label = _ellipsize(opt.get("label", f"Option {i + 1}"), 80)
                 button = ui.Button(
                     label=label,
                     style=discord.ButtonStyle.primary,
-                    custom_id=f"tmux_ask_{id(self)}_{i}",
+                    custom_id=f"{prefix}_{i}",
                 )
                 button.callback = self._make_option_callback(i, label)
                 self.add_item(button)
@@ -764,38 +1131,25 @@ class AskQuestionTmuxView(ui.View):
                 options = q.get("options", [])
                 is_multi = q.get("multiSelect", False)
                 header = q.get("header", f"Q{qi + 1}")
-                select_options = []
-                for oi, opt in enumerate(options[:25]):
-                    label = opt.get("label", f"Option {oi + 1}")
-                    desc = opt.get("description", "")
-                    if len(label) > 100:
-                        label = label[:97] + "..."
-                    if len(desc) > 100:
-                        desc = desc[:97] + "..."
-                    select_options.append(discord.SelectOption(
-                        label=label, description=desc or None, value=str(oi),
-                    ))
+                select_options = [
+                    discord.SelectOption(label=label, description=desc or None, value=str(oi))
+                    for oi, (label, desc) in enumerate(_select_option_texts(options))
+                ]
                 select = ui.Select(
                     placeholder=f"{header}: {q.get('question', '')[:90]}",
                     options=select_options,
                     min_values=1,
                     max_values=len(select_options) if is_multi else 1,
-                    custom_id=f"tmux_ask_{id(self)}_q{qi}",
+                    custom_id=f"{prefix}_q{qi}",
                 )
                 select.callback = self._make_select_callback(qi)
                 self.add_item(select)
-            submit_btn = ui.Button(
-                label="Submit", style=discord.ButtonStyle.success, emoji="\u2705",
-                custom_id=f"tmux_ask_{id(self)}_submit",
-            )
+            submit_btn = _submit_button(f"{prefix}_submit")
             submit_btn.callback = self._submit_multi
             self.add_item(submit_btn)
 
         # "Other" button for free text
-        other_btn = ui.Button(
-            label="Other", style=discord.ButtonStyle.secondary, emoji="\U0001f4ac",
-            custom_id=f"tmux_ask_{id(self)}_other",
-        )
+        other_btn = _other_button(f"{prefix}_other")
         other_btn.callback = self._other_callback
         self.add_item(other_btn)
 
@@ -803,17 +1157,14 @@ class AskQuestionTmuxView(ui.View):
 
     def _make_option_callback(self, index: int, label: str):
         async def callback(interaction: discord.Interaction) -> None:
-            loop = asyncio.get_running_loop()
-            success = await loop.run_in_executor(
-                None, _tmux_select_option, self.tmux_pane, index
-            )
+            await interaction.response.defer()  # Before tmux (see StopView._send_and_resolve)
+            success = await _tmux_select_option(self.tmux_pane, index)
             if success:
-                await interaction.response.defer()
                 await _mark_resolved(
-                    interaction.message, self, "\U0001f4ac", discord.Color.blue(), label
+                    interaction.message, self, "\U0001f4ac", _BLUE, label
                 )
             else:
-                await interaction.response.send_message("Failed to send to tmux.", ephemeral=True)
+                await interaction.followup.send("Failed to send to tmux.", ephemeral=True)
             self.stop()
         return callback
 
@@ -839,34 +1190,33 @@ class AskQuestionTmuxView(ui.View):
             )
             return
 
-        loop = asyncio.get_running_loop()
+        # Answering takes seconds (per-question render waits below), far past
+        # Discord's 3-second window, so acknowledge before touching tmux
+        await interaction.response.defer()
         # Small delay to ensure terminal UI is ready
         await asyncio.sleep(0.3)
         for qi in range(len(self._questions)):
             indices = self._answer_indices.get(qi, [])
             is_multi = self._questions[qi].get("multiSelect", False)
+            is_last = qi == len(self._questions) - 1
+            before = None if is_last else await _tmux_capture(self.tmux_pane)
             if is_multi:
-                success = await loop.run_in_executor(
-                    None, _tmux_select_multi_options, self.tmux_pane, indices
-                )
+                success = await _tmux_select_multi_options(self.tmux_pane, indices)
             else:
                 idx = indices[0] if indices else 0
-                success = await loop.run_in_executor(
-                    None, _tmux_select_option, self.tmux_pane, idx
-                )
+                success = await _tmux_select_option(self.tmux_pane, idx)
             if not success:
-                await interaction.response.send_message("Failed to send to tmux.", ephemeral=True)
+                await interaction.followup.send("Failed to send to tmux.", ephemeral=True)
                 return
-            # Wait for Claude Code to render the next question
-            if qi < len(self._questions) - 1:
-                await asyncio.sleep(1.5)
+            # Wait for Claude Code to render the next question (at most 1.5s)
+            if not is_last:
+                await _tmux_wait_settled(self.tmux_pane, before)
 
         parts = [f"Q{qi+1}: {', '.join(self._answer_labels.get(qi, []))}"
                  for qi in range(len(self._questions))]
         summary = "\n".join(parts)
-        await interaction.response.defer()
         await _mark_resolved(
-            interaction.message, self, "\U0001f4ac", discord.Color.blue(), summary[:200]
+            interaction.message, self, "\U0001f4ac", _BLUE, summary[:200]
         )
         self.stop()
 
@@ -883,7 +1233,7 @@ class AskQuestionTmuxView(ui.View):
     async def on_timeout(self) -> None:
         if self._original_message:
             await _mark_resolved(
-                self._original_message, self, "\u23f0", discord.Color.dark_grey()
+                self._original_message, self, "\u23f0", _GREY
             )
 
 
@@ -898,12 +1248,10 @@ class ApprovalView(ui.View):
 
     async def on_timeout(self) -> None:
         req = _pending.get(self.request_id)
-        if req and not req.event.is_set():
-            req.decision = "deny"
-            req.reason = "Timed out waiting for approval"
-            req.event.set()
+        if req and not req.future.done():
+            req.resolve("deny", "Timed out waiting for approval")
             if self._original_message:
-                await _mark_resolved(self._original_message, self, "\u23f0", discord.Color.dark_grey())
+                await _mark_resolved(self._original_message, self, "\u23f0", _GREY)
 
     @ui.button(label="Allow", style=discord.ButtonStyle.success, emoji="\u2705")
     async def allow(self, interaction: discord.Interaction, button: ui.Button) -> None:
@@ -911,10 +1259,8 @@ class ApprovalView(ui.View):
         if req is None:
             await interaction.response.send_message("This request has already expired.", ephemeral=True)
             return
-        req.decision = "allow"
-        req.event.set()
-        await interaction.response.defer()
-        await _mark_resolved(interaction.message, self, "\u2705", discord.Color.green())
+        req.resolve("allow")
+        await _mark_resolved(interaction.message, self, "\u2705", _GREEN, interaction=interaction)
         self.stop()
 
     @ui.button(label="Deny", style=discord.ButtonStyle.danger, emoji="\u274c")
@@ -923,10 +1269,8 @@ class ApprovalView(ui.View):
         if req is None:
             await interaction.response.send_message("This request has already expired.", ephemeral=True)
             return
-        req.decision = "deny"
-        req.event.set()
-        await interaction.response.defer()
-        await _mark_resolved(interaction.message, self, "\u274c", discord.Color.red())
+        req.resolve("deny")
+        await _mark_resolved(interaction.message, self, "\u274c", _RED, interaction=interaction)
         self.stop()
 
     @ui.button(label="Reply", style=discord.ButtonStyle.primary, emoji="\U0001f4ac")
@@ -943,14 +1287,13 @@ class ApprovalView(ui.View):
             return
         log.info("Allow All tapped: session_id=%r, request_id=%s", self.session_id, self.request_id[:8])
         if self.session_id:
-            _auto_allow_sessions.add(self.session_id)
+            _remember(_auto_allow_sessions, self.session_id, None, SESSION_TRACK_MAX)
             log.info("Session added to auto-allow: %s", self.session_id[:8])
         else:
             log.warning("Allow All: session_id is empty — auto-approve will NOT work")
-        req.decision = "allow"
-        req.event.set()
-        await interaction.response.defer()
-        await _mark_resolved(interaction.message, self, "\u2705", discord.Color.green(), "Auto-approving all")
+        req.resolve("allow")
+        await _mark_resolved(interaction.message, self, "\u2705", _GREEN, "Auto-approving all",
+                             interaction=interaction)
         self.stop()
 
 # ---------------------------------------------------------------------------
@@ -961,39 +1304,169 @@ intents = discord.Intents.default()
 bot = discord.Client(intents=intents)
 
 _bot_ready = asyncio.Event()
+_alert_task: asyncio.Task | None = None
+# The approval channel; see _get_channel
+_channel: discord.abc.Messageable | None = None
+_channel_lock = asyncio.Lock()
+
+
+async def _get_channel() -> discord.abc.Messageable | None:
+    """The approval channel, resolved on first use and then reused.
+
+    Concurrent first callers share one lookup.  A failed lookup is retried by
+    the next caller rather than remembered (None is returned meanwhile).
+    """
+    global _channel
+    if _channel is not None:
+        return _channel
+    async with _channel_lock:
+        if _channel is None:
+            try:
+                _channel = bot.get_channel(DISCORD_CHANNEL_ID) or await bot.fetch_channel(DISCORD_CHANNEL_ID)
+            except Exception:
+                log.exception("Discord channel %d not found", DISCORD_CHANNEL_ID)
+    return _channel
 
 
 @bot.event
 async def on_ready() -> None:
+    global _alert_task
     log.info("Discord bot connected as %s", bot.user)
+    await _get_channel()  # Resolve up front so the first request doesn't wait on it
     _bot_ready.set()
+    # on_ready fires again after reconnects; keep a single sender
+    if _alert_task is None:
+        _alert_task = asyncio.create_task(_alert_sender())
+
+
+def _cache_thread_name(thread: discord.Thread) -> None:
+    """Record thread under its current name in an already scanned channel."""
+    by_name = _thread_name_cache.get(thread.parent_id)
+    if by_name is None:
+        return  # Not scanned yet: the first lookup lists it anyway
+    for name, cached in list(by_name.items()):
+        if cached.id == thread.id and name != thread.name:
+            del by_name[name]  # Renamed
+    by_name[thread.name] = thread
+
+
+@bot.event
+async def on_thread_create(thread: discord.Thread) -> None:
+    # Includes threads created by other clients / a second server instance
+    _cache_thread_name(thread)
+
+
+@bot.event
+async def on_thread_update(before: discord.Thread, after: discord.Thread) -> None:
+    if before.name != after.name:
+        _cache_thread_name(after)
+
+
+@bot.event
+async def on_raw_thread_delete(payload: discord.RawThreadDeleteEvent) -> None:
+    # Raw event: also fires for threads that aren't in the client's cache
+    _forget_thread(payload.parent_id, payload.thread_id)
+
+# ---------------------------------------------------------------------------
+# Main-channel alerts — coalesced to stay under Discord's per-channel rate limit
+# ---------------------------------------------------------------------------
+
+ALERT_BATCH_WINDOW = 0.05  # seconds to wait for more alerts before posting
+ALERT_BATCH_MAX = 10
+DISCORD_MESSAGE_LIMIT = 2000
+
+_alert_queue: asyncio.Queue[str] = asyncio.Queue()
+
+
+def _post_alert(text: str) -> None:
+    """Queue a one-line alert for the main channel (sent by _alert_sender)."""
+    _alert_queue.put_nowait(text)
+
+
+async def _alert_sender() -> None:
+    """Post queued alerts, joining those that arrive together into one message."""
+    loop = asyncio.get_running_loop()
+    while True:
+        lines = [await _alert_queue.get()]
+        deadline = loop.time() + ALERT_BATCH_WINDOW
+        while len(lines) < ALERT_BATCH_MAX:
+            try:
+                lines.append(await asyncio.wait_for(
+                    _alert_queue.get(), timeout=max(0.0, deadline - loop.time()),
+                ))
+            except asyncio.TimeoutError:
+                break
+
+        messages = [lines[0]]
+        for line in lines[1:]:
+            if len(messages[-1]) + 1 + len(line) > DISCORD_MESSAGE_LIMIT:
+                messages.append(line)
+            else:
+                messages[-1] += "\n" + line
+
+        try:
+            channel = await _get_channel()
+            if channel is None:
+                raise RuntimeError("Discord channel not available")
+            for message in messages:
+                await channel.send(message)
+        except Exception:
+            log.exception("Failed to post %d alert(s) to the main channel", len(lines))
 
 # ---------------------------------------------------------------------------
 # HTTP API (called by the hook script)
 # ---------------------------------------------------------------------------
 
+# Transcript and team-config reads.  A pool of our own, so they don't queue
+# behind whatever else uses the loop's default executor (DNS lookups, etc.)
+_io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="disclaude-io")
+
+
+def _json_response(obj: dict, status: int = 200) -> web.Response:
+    """web.json_response, encoded with orjson when it is installed."""
+    if orjson is None:
+        return web.json_response(obj, status=status)
+    return web.Response(body=orjson.dumps(obj), status=status, content_type="application/json")
+
+
+# Body of the most common reply (every call from an "Allow All" session),
+# encoded once.  A Response can only be sent once, so that is built per call.
+_ALLOW_BODY = b'{"decision": "allow"}'
+
+
+def _allow_response() -> web.Response:
+    return web.Response(body=_ALLOW_BODY, content_type="application/json")
+
+
+def _read_transcript(fn: Callable, transcript_path: str, *args) -> asyncio.Future:
+    """Run fn(transcript_path, *args) on _io_executor.
+
+    Besides the transcript tail, fn reads sessions-index.json, team configs and
+    walks up for .git, so none of it runs on the event loop.  A non-string path
+    (the hook body may carry null) is passed on as "", i.e. no transcript.
+    """
+    if not isinstance(transcript_path, str):
+        transcript_path = ""
+    return asyncio.get_running_loop().run_in_executor(_io_executor, fn, transcript_path, *args)
+
+
 async def _ask_question_via_tmux(
     session_id: str, tool_name: str, tool_input: dict,
     transcript_path: str, cwd: str, tmux_pane: str,
 ) -> None:
     """Handle AskUserQuestion by sending Discord notification and injecting via tmux."""
     try:
+        # Transcript reads overlap with waiting for the bot (as in handle_approval)
+        context = _read_transcript(_extract_session_and_agent, transcript_path, cwd, tmux_pane)
+
         await _bot_ready.wait()
 
-        channel = bot.get_channel(DISCORD_CHANNEL_ID)
-        if channel is None:
-            channel = await bot.fetch_channel(DISCORD_CHANNEL_ID)
+        channel = await _get_channel()
         if channel is None:
             log.error("AskUserQuestion tmux: Discord channel not found")
             return
 
-        loop = asyncio.get_running_loop()
-        session_title, recent_context = await loop.run_in_executor(
-            None, _extract_session_context, transcript_path, cwd
-        )
-        agent_name = await loop.run_in_executor(
-            None, _extract_agent_name, transcript_path, tmux_pane
-        )
+        session_title, recent_context, agent_name = await context
 
         questions = tool_input.get("questions", [])
         input_display = _format_tool_input(tool_name, tool_input)
@@ -1007,17 +1480,18 @@ async def _ask_question_via_tmux(
         )
         if recent_context:
             embed.add_field(name="Recent conversation", value=_truncate(recent_context, 1000), inline=False)
-        embed.set_footer(text=f"Timeout: {APPROVAL_TIMEOUT}s | tmux: {tmux_pane}")
+        embed.set_footer(text=f"{_TIMEOUT_FOOTER} | tmux: {tmux_pane}")
 
         view = AskQuestionTmuxView(tmux_pane, questions)
 
-        thread = await _get_or_create_thread(channel, session_id, session_title)
-        sent_msg = await thread.send(embed=embed, view=view)
+        thread, sent_msg = await _send_to_session_thread(
+            channel, session_id, session_title, embed=embed, view=view,
+        )
         view._original_message = sent_msg
 
         alert_title = session_title or "Unknown"
         agent_label = f" ({agent_name})" if agent_name else ""
-        await channel.send(
+        _post_alert(
             f"\U0001f514 **{alert_title}**{agent_label} asks: \u2753 Question \u2192 {thread.mention}"
         )
         log.info("AskUserQuestion sent to Discord (tmux mode): session=%s", session_title or "?")
@@ -1026,32 +1500,68 @@ async def _ask_question_via_tmux(
         log.exception("Failed to handle AskUserQuestion via tmux")
 
 
+async def _await_decision(req: PendingRequest) -> web.Response:
+    """Wait for the answer to req and build the hook's response.
+
+    Several handlers may wait on one request (a hook retry joins the original),
+    so the future is shielded and a timeout settles it for all of them.
+    """
+    req.waiters += 1
+    try:
+        decision, reason = await asyncio.wait_for(asyncio.shield(req.future), timeout=APPROVAL_TIMEOUT + 5)
+    except asyncio.TimeoutError:
+        req.resolve("deny", "Timed out waiting for approval")
+        decision, reason = req.future.result()
+    finally:
+        _release_pending(req)
+
+    if decision is None:
+        return _json_response({"error": reason}, status=503)
+
+    result: dict = {"decision": decision}
+    if reason:
+        result["reason"] = reason
+
+    log.info("Returning decision: %s (reason=%s)", result["decision"], result.get("reason"))
+    return _json_response(result)
+
+
 async def handle_approval(request: web.Request) -> web.Response:
     """Receive a tool approval request from the hook script."""
     try:
-        body = await request.json()
+        body = _json_loads(await request.read())
     except Exception:
-        return web.json_response({"error": "invalid json"}, status=400)
+        return _json_response({"error": "invalid json"}, status=400)
 
     request_id: str = body.get("request_id", "")
     tool_name: str = body.get("tool_name", "unknown")
-    tool_input: dict = body.get("tool_input", {})
-    transcript_path: str = body.get("transcript_path", "")
-    cwd: str = body.get("cwd", "")
-
     session_id: str = body.get("session_id", "")
 
     if not request_id:
-        return web.json_response({"error": "request_id required"}, status=400)
+        return _json_response({"error": "request_id required"}, status=400)
+
+    # A retried hook call for a request already in flight (its prompt posted or
+    # still being posted) waits on that request instead of posting a second one
+    existing = _pending.get(request_id)
+    if existing is not None:
+        log.info("Duplicate approval request [%s], waiting on the existing prompt", request_id[:8])
+        return await _await_decision(existing)
+
+    # Auto-approve if "Allow All" was previously selected for this session.
+    # Checked before anything else is read: after "Allow All" this is the
+    # common case, and it needs no transcript I/O or Discord calls.  (The
+    # session was tracked below when its first request came through.)
+    if session_id in _auto_allow_sessions:
+        log.info("Auto-approved (Allow All): %s [%s]", tool_name, session_id[:8])
+        return _allow_response()
+
+    tool_input: dict = body.get("tool_input", {})
+    transcript_path: str = body.get("transcript_path", "")
+    cwd: str = body.get("cwd", "")
 
     # Track sessions that have gone through approval
     if session_id:
-        _sessions_with_approvals.add(session_id)
-
-    # Auto-approve if "Allow All" was previously selected for this session
-    if session_id in _auto_allow_sessions:
-        log.info("Auto-approved (Allow All): %s [%s]", tool_name, session_id[:8])
-        return web.json_response({"decision": "allow"})
+        _remember(_sessions_with_approvals, session_id, None, SESSION_TRACK_MAX)
 
     # AskUserQuestion + tmux: allow immediately, inject answer via tmux in background
     tmux_pane: str = body.get("tmux_pane", "")
@@ -1062,99 +1572,90 @@ async def handle_approval(request: web.Request) -> web.Response:
         ))
         log.info("AskUserQuestion: allow + tmux inject (pane=%s, session=%s)",
                  tmux_pane, session_id[:8] if session_id else "?")
-        return web.json_response({"decision": "allow"})
+        return _allow_response()
 
-    # Create pending request
-    req = PendingRequest(request_id=request_id, tool_name=tool_name, tool_input=tool_input)
+    # Register the request before the first await, so a hook retry arriving
+    # while this handler is still posting the prompt joins it.  Retries hold it
+    # too: the entry stays until it is answered or no handler waits on it.
+    req = PendingRequest(request_id=request_id, tool_name=tool_name, tool_input=tool_input, waiters=1)
     _pending[request_id] = req
+    posted = False
+    try:
+        # Extract session context (run in executor to avoid blocking).  Start it
+        # before waiting for the bot so it overlaps with its startup after a restart
+        context = _read_transcript(_extract_session_and_agent, transcript_path, cwd, tmux_pane)
 
-    # Wait for bot to be ready
-    await _bot_ready.wait()
-
-    # Send Discord message
-    channel = bot.get_channel(DISCORD_CHANNEL_ID)
-    if channel is None:
-        try:
-            channel = await bot.fetch_channel(DISCORD_CHANNEL_ID)
-        except Exception:
-            _pending.pop(request_id, None)
-            return web.json_response({"error": "Discord channel not found"}, status=500)
+        # Wait for bot to be ready
+        await _bot_ready.wait()
 
-    # Extract session context (run in executor to avoid blocking)
-    loop = asyncio.get_running_loop()
-    session_title, recent_context = await loop.run_in_executor(
-        None, _extract_session_context, transcript_path, cwd
-    )
-    agent_name = await loop.run_in_executor(
-        None, _extract_agent_name, transcript_path, tmux_pane
-    )
-    if agent_name:
-        log.info("Agent identified: %s (tmux=%s)", agent_name, tmux_pane or "n/a")
+        # Send Discord message
+        channel = await _get_channel()
+        if channel is None:
+            return _json_response({"error": "Discord channel not found"}, status=503)
 
-    # Format the tool input for display
-    input_display = _format_tool_input(tool_name, tool_input)
+        session_title, recent_context, agent_name = await context
+        if agent_name:
+            log.info("Agent identified: %s (tmux=%s)", agent_name, tmux_pane or "n/a")
 
-    # Build title: [session] 🔧 Tool  or  [session] 🤖 agent > 🔧 Tool
-    title_prefix = f"[{session_title}] " if session_title else ""
-    agent_prefix = f"\U0001f916 {agent_name} \u203a " if agent_name else ""
-    embed = discord.Embed(
-        title=f"{title_prefix}{agent_prefix}\U0001f527 {tool_name}",
-        description=input_display,
-        color=_session_color(session_id),
-    )
+        # Format the tool input for display
+        input_display = _format_tool_input(tool_name, tool_input)
 
-    # Add recent conversation context
-    if recent_context:
-        embed.add_field(name="Recent conversation", value=_truncate(recent_context, 1000), inline=False)
+        # Build title: [session] 🔧 Tool  or  [session] 🤖 agent > 🔧 Tool
+        title_prefix = f"[{session_title}] " if session_title else ""
+        agent_prefix = f"\U0001f916 {agent_name} \u203a " if agent_name else ""
+        embed = discord.Embed(
+            title=f"{title_prefix}{agent_prefix}\U0001f527 {tool_name}",
+            description=input_display,
+            color=_session_color(session_id),
+        )
 
-    footer_parts = [f"ID: {request_id[:8]}\u2026", f"Timeout: {APPROVAL_TIMEOUT}s"]
-    if cwd:
-        footer_parts.append(Path(cwd).name)
-    embed.set_footer(text=" | ".join(footer_parts))
+        # Add recent conversation context
+        if recent_context:
+            embed.add_field(name="Recent conversation", value=_truncate(recent_context, 1000), inline=False)
 
-    # Use AskUserQuestion view if applicable
-    if tool_name == "AskUserQuestion":
-        questions = tool_input.get("questions", [])
-        view = AskUserQuestionView(request_id, questions)
-    else:
-        view = ApprovalView(request_id, session_id)
+        footer = f"ID: {request_id[:8]}\u2026 | {_TIMEOUT_FOOTER}"
+        if cwd:
+            footer += f" | {Path(cwd).name}"
+        embed.set_footer(text=footer)
 
-    # Send to session thread
-    thread = await _get_or_create_thread(channel, session_id, session_title)
-    sent_msg = await thread.send(embed=embed, view=view)
-    view._original_message = sent_msg
-
-    # Post brief alert in main channel linking to the thread
-    alert_title = session_title or "Unknown"
-    agent_label = f" ({agent_name})" if agent_name else ""
-    await channel.send(
-        f"\U0001f514 **{alert_title}**{agent_label} needs approval: **{tool_name}** \u2192 {thread.mention}"
-    )
-    log.info("Approval request sent to Discord: %s [%s] session=%s", tool_name, request_id[:8], session_title or "?")
-
-    # Wait for user response
-    try:
-        await asyncio.wait_for(req.event.wait(), timeout=APPROVAL_TIMEOUT + 5)
-    except asyncio.TimeoutError:
-        req.decision = "deny"
-        req.reason = "Timed out waiting for approval"
+        # Use AskUserQuestion view if applicable
+        if tool_name == "AskUserQuestion":
+            questions = tool_input.get("questions", [])
+            view = AskUserQuestionView(request_id, questions)
+        else:
+            view = ApprovalView(request_id, session_id)
 
-    _pending.pop(request_id, None)
+        # Send to session thread
+        thread, sent_msg = await _send_to_session_thread(
+            channel, session_id, session_title, embed=embed, view=view,
+        )
+        view._original_message = sent_msg
+        posted = True
 
-    result: dict = {"decision": req.decision or "deny"}
-    if req.reason:
-        result["reason"] = req.reason
+        # Post brief alert in main channel linking to the thread
+        alert_title = session_title or "Unknown"
+        agent_label = f" ({agent_name})" if agent_name else ""
+        _post_alert(
+            f"\U0001f514 **{alert_title}**{agent_label} needs approval: **{tool_name}** \u2192 {thread.mention}"
+        )
+        log.info("Approval request sent to Discord: %s [%s] session=%s", tool_name, request_id[:8], session_title or "?")
 
-    log.info("Returning decision: %s (reason=%s)", result["decision"], result.get("reason"))
-    return web.json_response(result)
+        # Wait for user response
+        return await _await_decision(req)
+    finally:
+        if not posted:
+            # Error or cancellation before the prompt was sent: retries waiting
+            # on this request get the same failure instead of a silent timeout
+            req.resolve(None, "Approval request could not be posted to Discord")
+        _release_pending(req)
 
 
 async def handle_stop(request: web.Request) -> web.Response:
     """Receive a stop notification — Claude session has finished."""
     try:
-        body = await request.json()
+        body = _json_loads(await request.read())
     except Exception:
-        return web.json_response({"error": "invalid json"}, status=400)
+        return _json_response({"error": "invalid json"}, status=400)
 
     session_id: str = body.get("session_id", "")
     transcript_path: str = body.get("transcript_path", "")
@@ -1164,19 +1665,12 @@ async def handle_stop(request: web.Request) -> web.Response:
 
     await _bot_ready.wait()
 
-    channel = bot.get_channel(DISCORD_CHANNEL_ID)
+    channel = await _get_channel()
     if channel is None:
-        try:
-            channel = await bot.fetch_channel(DISCORD_CHANNEL_ID)
-        except Exception:
-            return web.json_response({"error": "Discord channel not found"}, status=500)
+        return _json_response({"error": "Discord channel not found"}, status=503)
 
-    loop = asyncio.get_running_loop()
-    session_title, _ = await loop.run_in_executor(
-        None, _extract_session_context, transcript_path, cwd
-    )
-    last_message = await loop.run_in_executor(
-        None, _extract_last_assistant_message, transcript_path
+    session_title, _, last_message = await _read_transcript(
+        _extract_transcript_info, transcript_path, cwd,
     )
 
     # Detect if Claude is asking a question (needs interactive response)
@@ -1205,12 +1699,10 @@ async def handle_stop(request: web.Request) -> web.Response:
         embed.set_footer(text=Path(cwd).name)
 
     # Send to session thread
-    thread = await _get_or_create_thread(channel, session_id, session_title)
-
     if is_question and tmux_pane:
         # Question detected — show Yes/No/Reply buttons
         view = StopView(tmux_pane)
-        await thread.send(embed=embed, view=view)
+        await _send_to_session_thread(channel, session_id, session_title, embed=embed, view=view)
         log.info("Stop notification sent (question): session=%s tmux=%s", session_title or "?", tmux_pane)
     elif tmux_pane:
         # Paused but not a question — Reply button only
@@ -1220,63 +1712,98 @@ async def handle_stop(request: web.Request) -> web.Response:
             await interaction.response.send_modal(StopReplyModal(tmux_pane))
         reply_btn.callback = _reply_cb
         view.add_item(reply_btn)
-        await thread.send(embed=embed, view=view)
+        await _send_to_session_thread(channel, session_id, session_title, embed=embed, view=view)
         log.info("Stop notification sent (paused): session=%s tmux=%s", session_title or "?", tmux_pane)
     else:
-        await thread.send(embed=embed)
+        await _send_to_session_thread(channel, session_id, session_title, embed=embed)
         log.info("Stop notification sent (finished): session=%s", session_title or "?")
-        _sessions_with_approvals.discard(session_id)
-        _auto_allow_sessions.discard(session_id)
+        _sessions_with_approvals.pop(session_id, None)
+        _auto_allow_sessions.pop(session_id, None)
         await _archive_thread(session_id)
 
-    return web.json_response({"status": "ok"})
+    return _json_response({"status": "ok"})
 
 
 async def handle_health(request: web.Request) -> web.Response:
     """Health check endpoint."""
-    return web.json_response({"status": "ok", "bot_ready": _bot_ready.is_set()})
+    return _json_response({"status": "ok", "bot_ready": _bot_ready.is_set()})
+
+
+def _format_bash(tool_input: dict) -> str:
+    desc = tool_input.get("description", "")
+    heading = f"**{desc}**\n" if desc else ""
+    return f"{heading}```bash\n{_truncate(tool_input['command'], 1500)}\n```"
+
+
+def _format_write(tool_input: dict) -> str:
+    content = tool_input.get("content", "")
+    path = tool_input["file_path"]
+    preview = _truncate(content, 800)
+    return f"**File:** `{path}`\n```\n{preview}\n```"
+
+
+def _format_edit(tool_input: dict) -> str:
+    path = tool_input["file_path"]
+    old = _truncate(tool_input.get("old_string", ""), 400)
+    new = _truncate(tool_input.get("new_string", ""), 400)
+    return f"**File:** `{path}`\n**Old:**\n```\n{old}\n```\n**New:**\n```\n{new}\n```"
+
+
+def _format_read(tool_input: dict) -> str:
+    return f"**File:** `{tool_input['file_path']}`"
+
+
+def _format_ask(tool_input: dict) -> str:
+    questions = tool_input["questions"]
+    parts = []
+    for q in questions:
+        parts.append(f"**{q.get('question', '')}**")
+        for i, opt in enumerate(q.get("options", []), 1):
+            label = opt.get("label", "")
+            desc = opt.get("description", "")
+            parts.append(f"{i}. **{label}**" + (f" — {desc}" if desc else ""))
+    return "\n".join(parts)
+
+
+def _format_generic(tool_input) -> str:
+    # Only the first 1500 characters are shown.  Cap long top-level strings
+    # (file bodies, tool results) before serializing so they aren't encoded in
+    # full; a capped string still spans the visible prefix, so the output is
+    # the same.  (tool_input is whatever JSON the hook sent, not always a dict.)
+    if isinstance(tool_input, dict):
+        tool_input = {
+            k: v[:1500] if isinstance(v, str) and len(v) > 1500 else v
+            for k, v in tool_input.items()
+        }
+    formatted = None
+    if orjson is not None:
+        try:
+            # Same layout as the json.dumps call below
+            formatted = orjson.dumps(tool_input, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:  # e.g. an integer beyond 64 bits
+            pass
+    if formatted is None:
+        formatted = json.dumps(tool_input, ensure_ascii=False, indent=2)
+    return f"```json\n{_truncate(formatted, 1500)}\n```"
+
+
+# tool name -> (input key the formatter needs, formatter); anything else, or
+# an input without that key, gets the generic JSON dump
+_FORMATTERS: dict[str, tuple[str, Callable[[dict], str]]] = {
+    "Bash": ("command", _format_bash),
+    "Write": ("file_path", _format_write),
+    "Edit": ("file_path", _format_edit),
+    "Read": ("file_path", _format_read),
+    "AskUserQuestion": ("questions", _format_ask),
+}
 
 
 def _format_tool_input(tool_name: str, tool_input: dict) -> str:
     """Format tool input for readable Discord display."""
-    if tool_name == "Bash" and "command" in tool_input:
-        cmd = tool_input["command"]
-        desc = tool_input.get("description", "")
-        parts = []
-        if desc:
-            parts.append(f"**{desc}**")
-        parts.append(f"```bash\n{_truncate(cmd, 1500)}\n```")
-        return "\n".join(parts)
-
-    if tool_name == "Write" and "file_path" in tool_input:
-        content = tool_input.get("content", "")
-        path = tool_input["file_path"]
-        preview = _truncate(content, 800)
-        return f"**File:** `{path}`\n```\n{preview}\n```"
-
-    if tool_name == "Edit" and "file_path" in tool_input:
-        path = tool_input["file_path"]
-        old = _truncate(tool_input.get("old_string", ""), 400)
-        new = _truncate(tool_input.get("new_string", ""), 400)
-        return f"**File:** `{path}`\n**Old:**\n```\n{old}\n```\n**New:**\n```\n{new}\n```"
-
-    if tool_name == "Read" and "file_path" in tool_input:
-        return f"**File:** `{tool_input['file_path']}`"
-
-    if tool_name == "AskUserQuestion" and "questions" in tool_input:
-        questions = tool_input["questions"]
-        parts = []
-        for q in questions:
-            parts.append(f"**{q.get('question', '')}**")
-            for i, opt in enumerate(q.get("options", []), 1):
-                label = opt.get("label", "")
-                desc = opt.get("description", "")
-                parts.append(f"{i}. **{label}**" + (f" — {desc}" if desc else ""))
-        return "\n".join(parts)
-
-    # Generic fallback
-    formatted = json.dumps(tool_input, ensure_ascii=False, indent=2)
-    return f"```json\n{_truncate(formatted, 1500)}\n```"
+    entry = _FORMATTERS.get(tool_name)
+    if entry is not None and isinstance(tool_input, dict) and entry[0] in tool_input:
+        return entry[1](tool_input)
+    return _format_generic(tool_input)
 
 
 def _truncate(text: str, max_len: int) -> str:
@@ -1288,13 +1815,40 @@ def _truncate(text: str, max_len: int) -> str:
 # Startup
 # ---------------------------------------------------------------------------
 
-async def _run_http(app: web.Application) -> None:
-    runner = web.AppRunner(app)
+async def _run_http(app: web.Application) -> web.AppRunner:
+    # No access log: every hook call would add a formatted INFO line, and the
+    # handlers already log what matters (decisions, notifications)
+    runner = web.AppRunner(app, access_log=None)
     await runner.setup()
-    site = web.TCPSite(runner, "127.0.0.1", PORT)
+    # Hooks from parallel sessions/subagents can connect in bursts; asyncio
+    # already sets TCP_NODELAY on every accepted connection.  reuse_port stays
+    # off: a second server on the same port would silently take half the requests.
+    site = web.TCPSite(runner, "127.0.0.1", PORT, backlog=256)
     await site.start()
     log.info("HTTP server listening on http://127.0.0.1:%d", PORT)
 
+    if SOCKET_PATH:
+        unix_site = web.UnixSite(runner, SOCKET_PATH)
+        # Only the current user's hooks may connect: create the socket 0600
+        # rather than chmod it after it is already listening
+        old_umask = os.umask(0o177)
+        try:
+            await unix_site.start()
+        finally:
+            os.umask(old_umask)
+        log.info("HTTP server listening on unix:%s", SOCKET_PATH)
+
+    return runner
+
+
+async def _stop_http(runner: web.AppRunner) -> None:
+    await runner.cleanup()
+    if SOCKET_PATH:
+        try:
+            os.unlink(SOCKET_PATH)
+        except FileNotFoundError:
+            pass
+
 
 async def _async_main() -> None:
     # Validate config
@@ -1311,7 +1865,7 @@ async def _async_main() -> None:
     app.router.add_post("/notify-stop", handle_stop)
     app.router.add_get("/health", handle_health)
 
-    await _run_http(app)
+    runner = await _run_http(app)
 
     # Discord bot (runs forever)
     try:
@@ -1320,11 +1874,19 @@ async def _async_main() -> None:
         pass
     finally:
         await bot.close()
+        await _stop_http(runner)
 
 
 def main() -> None:
     try:
-        asyncio.run(_async_main())
+        import uvloop  # optional: pip install -e '.[fast]' (not on Windows)
+    except ImportError:
+        uvloop = None
+    try:
+        if uvloop is not None:
+            uvloop.run(_async_main())
+        else:
+            asyncio.run(_async_main())
     except KeyboardInterrupt:
         log.info("Shutting down.")
 